@@ -0,0 +1,225 @@
+import numpy as np
+
+from bisect import bisect_left, bisect_right, insort
+
+from predicates import orient2d
+
+# Blocks split once they hold twice this many vertices
+LOAD = 256
+
+
+# Sorted list kept in blocks of at most 2 * LOAD elements, found by bisecting the blocks' last elements. Inserting or
+# deleting shifts a single block, plus the short block index when a block splits or empties
+class SortedBlocks:
+    __slots__ = ("blocks", "maxes", "size")
+
+    def __init__(self):
+        self.blocks = []
+        self.maxes = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for block in self.blocks:
+            yield from block
+
+    def __contains__(self, p):
+        return self.ceiling(p) == p
+
+    def add(self, p):
+        blocks, maxes = self.blocks, self.maxes
+        self.size += 1
+
+        if not blocks:
+            blocks.append([p])
+            maxes.append(p)
+            return
+
+        b = min(bisect_left(maxes, p), len(blocks) - 1)
+        block = blocks[b]
+        insort(block, p)
+        maxes[b] = block[-1]
+
+        if len(block) > 2 * LOAD:
+            blocks[b:b + 1] = [block[:LOAD], block[LOAD:]]
+            maxes[b:b + 1] = [block[LOAD - 1], block[-1]]
+
+    def remove(self, p):
+        blocks, maxes = self.blocks, self.maxes
+        self.size -= 1
+
+        b = bisect_left(maxes, p)
+        block = blocks[b]
+        del block[bisect_left(block, p)]
+
+        if block:
+            maxes[b] = block[-1]
+        else:
+            del blocks[b]
+            del maxes[b]
+
+    def lower(self, p):
+        # Largest element below p, or None
+        return self.__before(p, bisect_left)
+
+    def floor(self, p):
+        # Largest element up to p, or None
+        return self.__before(p, bisect_right)
+
+    def ceiling(self, p):
+        # Smallest element from p on, or None
+        return self.__after(p, bisect_left)
+
+    def higher(self, p):
+        # Smallest element above p, or None
+        return self.__after(p, bisect_right)
+
+    def peak(self, rising):
+        # Last element of the leading run where rising(element, next element) holds, which must never hold again after it
+        blocks = self.blocks
+        lo, hi = 0, len(blocks) - 1
+
+        # First the block holding it, judged by the step from each block into the next one
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rising(blocks[mid][-1], blocks[mid + 1][0]):
+                lo = mid + 1
+            else:
+                hi = mid
+
+        block = blocks[lo]
+        lo, hi = 0, len(block) - 1
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rising(block[mid], block[mid + 1]):
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return block[lo]
+
+    def __before(self, p, find):
+        blocks = self.blocks
+        b = find(self.maxes, p)
+
+        if b < len(blocks):
+            k = find(blocks[b], p)
+            if k:
+                return blocks[b][k - 1]
+        return blocks[b - 1][-1] if b else None
+
+    def __after(self, p, find):
+        blocks = self.blocks
+        b = find(self.maxes, p)
+
+        # The block's last element is at least p, so the answer is in it
+        if b == len(blocks):
+            return None
+        return blocks[b][find(blocks[b], p)]
+
+
+# One monotone half of the hull, vertices sorted by (x, y). The lower chain (sign 1) turns left going right,
+# the upper chain (sign -1) turns right, and both run from the lowest leftmost to the highest rightmost point
+class HalfHull:
+    __slots__ = ("points", "sign")
+
+    def __init__(self, sign: int):
+        self.points = SortedBlocks()
+        self.sign = sign
+
+    def turn(self, a: tuple, b: tuple, c: tuple):
+        return self.sign * orient2d(*a, *b, *c)
+
+    def add(self, p: tuple):
+        # True if p became a vertex, the vertices it hides are dropped from both sides
+        points = self.points
+        b = points.ceiling(p)
+        if b == p:
+            return False
+
+        a = points.lower(p)
+        if a is not None and b is not None and self.turn(a, b, p) >= 0:
+            return False
+
+        points.add(p)
+
+        while a is not None:
+            before = points.lower(a)
+            if before is None or self.turn(before, a, p) > 0:
+                break
+            points.remove(a)
+            a = before
+
+        while b is not None:
+            after = points.higher(b)
+            if after is None or self.turn(p, b, after) > 0:
+                break
+            points.remove(b)
+            b = after
+
+        return True
+
+    def covers(self, p: tuple):
+        # True if p is on this chain or on its inner side, within its x range
+        a = self.points.floor(p)
+        if a is None:
+            return False
+
+        b = self.points.higher(p)
+        if b is None:
+            return a == p
+        return self.turn(a, b, p) >= 0
+
+    def extreme(self, dx: float, dy: float):
+        # Projections onto (dx, dy) are unimodal along a convex chain, so the peak is where they stop growing
+        return self.points.peak(lambda a, b: dx * (b[0] - a[0]) + dy * (b[1] - a[1]) > 0)
+
+
+# Convex hull under insertions. Each point costs O(log h) searches and a bounded block shift, and the vertices it hides are
+# removed for amortized O(1) each. Queries are O(log h)
+class DynamicHull:
+    __slots__ = ("lower", "upper")
+
+    def __init__(self, points=()):
+        self.lower = HalfHull(1)
+        self.upper = HalfHull(-1)
+        self.update(points)
+
+    def __len__(self):
+        # Number of vertices, the chains share their two endpoints
+        h = len(self.lower.points) + len(self.upper.points) - 2
+        return h if h >= 3 else len(self.lower.points)
+
+    def add(self, point):
+        # True if the point is a new hull vertex
+        p = (float(point[0]), float(point[1]))
+        added_lower = self.lower.add(p)
+        added_upper = self.upper.add(p)
+        return added_lower or added_upper
+
+    def update(self, points):
+        for point in points:
+            self.add(point)
+
+    def contains(self, point):
+        # Inside or on the boundary
+        p = (float(point[0]), float(point[1]))
+        return self.lower.covers(p) and self.upper.covers(p)
+
+    def extreme(self, direction):
+        # A hull vertex maximising the dot product with direction, the lower chain has all of them facing down
+        if not len(self.lower.points):
+            raise ValueError("Empty hull")
+
+        dx, dy = float(direction[0]), float(direction[1])
+        chain = self.lower if dy <= 0 else self.upper
+        return chain.extreme(dx, dy)
+
+    def vertices(self):
+        # Counterclockwise from the lowest leftmost point, like chain_hull
+        lower, upper = list(self.lower.points), list(self.upper.points)
+        hull = lower[:-1] + upper[:0:-1]
+        return np.array(hull if len(hull) >= 3 else lower, dtype=np.float64).reshape(-1, 2)
\ No newline at end of file
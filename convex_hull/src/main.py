@@ -1,26 +1,48 @@
+import os
 import sys
 import time
 import math
-import random
+import argparse
+import numpy as np
 import matplotlib.pyplot as plt
 
-from clifford import Cl
+from functools import cache
+from concurrent.futures import ProcessPoolExecutor
 
-# 2D PGA
-layout, blades = Cl(2, 0, 1, firstIdx=0)
-e01 = blades['e01']
-e02 = blades['e02']
-e12 = blades['e12']
+from predicates import orient2d, orient2d_batch
+from dynamic_hull import DynamicHull
 
 rand_limit = (-1.0, 1.0)
 plot_limit = (-1.5, 1.5)
 
+# Chunks smaller than this aren't worth a process of their own
+MIN_CHUNK = 1 << 16
+
+
+@cache
+def pga_blades():
+    # 2D PGA, clifford is slow to import so only the clifford backend pays for it
+    from clifford import Cl
+
+    layout, blades = Cl(2, 0, 1, firstIdx=0)
+    return blades['e01'], blades['e02'], blades['e12']
+
 
 class Point:
+    __slots__ = ("x", "y", "_M")
+
     def __init__(self, x: float, y: float):
         self.x = x
         self.y = y
-        self.M = e12 + x*e02 - y*e01
+        self._M = None
+
+    @property
+    def M(self):
+        # Multivector built on first use, the float backend never needs it
+        if self._M is None:
+            e01, e02, e12 = pga_blades()
+            self._M = e12 + self.x*e02 - self.y*e01
+        return self._M
 
     def __and__(self, other):
         if isinstance(other, Point):
@@ -113,8 +135,26 @@ def plot_hull(hull: list, points: list):
     plt.show()
 
 
+def float_turn(a: Point, b: Point, c: Point):
+    # Positive for a counterclockwise turn, exact for nearly collinear points
+    return orient2d(a.x, a.y, b.x, b.y, c.x, c.y)
+
+
+def clifford_turn(a: Point, b: Point, c: Point):
+    # Same sign as float_turn, from the PGA join of the three points
+    return (a.M & b.M & c.M).value[0]
+
+
+TURNS = {
+    "float": float_turn,
+    "clifford": clifford_turn,
+}
+
+
 @profiler
-def graham_convex_hull(points: list):
+def graham_convex_hull(points: list, backend: str="float"):
+    turn = TURNS[backend]
+
     # Find the point with the lowest Y coordinate, with the right most X coordinate
     pivot = min(points, key=lambda p: (p.y, p.x))
 
@@ -130,24 +170,167 @@ def graham_convex_hull(points: list):
     hull = [pivot]
 
     for p in sorted_points:
-        while len(hull) >= 2 and (hull[-2].M & hull[-1].M & p.M).value[0] < 0:
+        while len(hull) >= 2 and turn(hull[-2], hull[-1], p) < 0:
             hull.pop()
         hull.append(p)
 
     return hull, sorted_points
 
 
+def akl_toussaint_filter(points: np.ndarray):
+    # Mask of the points that can be on the hull: everything strictly inside the quadrilateral
+    # of the leftmost, lowest, rightmost and highest points is dropped in one pass
+    xs, ys = points[:, 0], points[:, 1]
+    corners = points[[np.argmin(xs), np.argmin(ys), np.argmax(xs), np.argmax(ys)]]
+
+    inside = np.ones(len(points), dtype=bool)
+    for k in range(4):
+        inside &= orient2d_batch(corners[k], corners[(k + 1) % 4], points) > 0
+
+    return ~inside
+
+
+def half_chain(points: list):
+    # Keeps only left turns, so collinear points are dropped too
+    chain = []
+    for x, y in points:
+        while len(chain) >= 2 and orient2d(*chain[-2], *chain[-1], x, y) <= 0:
+            chain.pop()
+        chain.append((x, y))
+    return chain
+
+
+def chain_hull(points: np.ndarray):
+    # Andrew's monotone chain over an (n, 2) array in any order. Returns the counterclockwise hull starting from the
+    # lowest of the leftmost points
+    if len(points) < 3:
+        return np.unique(points, axis=0)
+
+    points = points[np.lexsort((points[:, 1], points[:, 0]))].tolist()
+    lower = half_chain(points)
+    upper = half_chain(reversed(points))
+
+    # Each chain ends where the other one starts
+    hull = lower[:-1] + upper[:-1]
+    return np.array(hull if len(hull) >= 3 else lower, dtype=np.float64).reshape(-1, 2)
+
+
+@profiler
+def monotone_chain_hull(points: np.ndarray):
+    # The input is left untouched, filtering and sorting work on copies
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) < 3:
+        return np.unique(points, axis=0)
+
+    return chain_hull(points[akl_toussaint_filter(points)])
+
+
+def half_quickhull(a: np.ndarray, b: np.ndarray, points: np.ndarray):
+    # Hull vertices strictly right of a -> b, in order from a to b. Explicit stack, a vertex entry has no points
+    chain = []
+    stack = [(a, b, points)]
+
+    while stack:
+        a, b, points = stack.pop()
+        if points is None:
+            chain.append(a)
+            continue
+        if not len(points):
+            continue
+
+        # The farthest point is on the hull, everything inside the triangle it makes with a and b is dropped
+        c = points[np.argmin(orient2d_batch(a, b, points))]
+        stack.append((c, b, points[orient2d_batch(c, b, points) < 0]))
+        stack.append((c, None, None))
+        stack.append((a, c, points[orient2d_batch(a, c, points) < 0]))
+
+    return chain
+
+
+def quickhull_core(points: np.ndarray):
+    if len(points) < 3:
+        return np.unique(points, axis=0)
+
+    # Lowest of the leftmost and highest of the rightmost points split the set into lower and upper halves
+    xs = points[:, 0]
+    left, right = points[xs == xs.min()], points[xs == xs.max()]
+    a, b = left[np.argmin(left[:, 1])], right[np.argmax(right[:, 1])]
+
+    side = orient2d_batch(a, b, points)
+    hull = [a, *half_quickhull(a, b, points[side < 0]), b, *half_quickhull(b, a, points[side > 0])]
+
+    # Tied farthest points can leave collinear vertices behind, a chain over the h vertices removes them
+    return chain_hull(np.array(hull))
+
+
+@profiler
+def quickhull(points: np.ndarray):
+    # Output sensitive, O(n log h) expected
+    return quickhull_core(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+
+
+@profiler
+def parallel_hull(points: np.ndarray, workers: int=None):
+    # Partial hulls of contiguous chunks in separate processes, merged by a monotone chain over their vertices
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    workers = min(workers or os.cpu_count(), len(points) // MIN_CHUNK)
+
+    if workers <= 1:
+        return quickhull_core(points)
+
+    with ProcessPoolExecutor(workers) as pool:
+        parts = list(pool.map(quickhull_core, np.array_split(points, workers)))
+
+    return chain_hull(np.concatenate(parts))
+
+
+@profiler
+def dynamic_hull(points: np.ndarray):
+    # Streams the points one by one into a DynamicHull, as if they arrived over time
+    hull = DynamicHull()
+    hull.update(np.asarray(points, dtype=np.float64).reshape(-1, 2).tolist())
+    return hull.vertices()
+
+
+class HelpOnErrorParser(argparse.ArgumentParser):
+    def error(self, _):
+        self.print_help()
+        sys.exit(2)
+
+
+def parse_args():
+    parser = HelpOnErrorParser(description="Convex Hull Parameters")
+
+    parser.add_argument("n", type=int, nargs="?", default=3, help="Number of random points (default: 3)")
+    parser.add_argument("--engine", choices=["graham", "monotone", "quickhull", "parallel", "dynamic"], default="graham", help="Graham scan over Point objects, Akl-Toussaint filtering plus monotone chain, output sensitive QuickHull, QuickHull over chunks in a process pool, or point by point insertion into a DynamicHull; all but graham work on a NumPy array (default: graham)")
+    parser.add_argument("--workers", type=int, required=False, help="Parallel: number of processes (default: all cores)")
+    parser.add_argument("--backend", choices=list(TURNS), default="float", help="Graham: turn test as a float cross product, or the PGA join of clifford multivectors as a reference (default: float)")
+
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3
-
-    points = []
-    for _ in range(n):
-        x = random.uniform(*rand_limit)
-        y = random.uniform(*rand_limit)
-        points.append(Point(x, y))
-        
-    hull, sorted_points = graham_convex_hull(points)
-
-    plot_points(sorted_points, enum=True)
-    plot_pivot_with_lines(sorted_points, enum=True)
-    plot_hull(hull, sorted_points)
\ No newline at end of file
+    args = parse_args()
+
+    coords = np.random.uniform(*rand_limit, size=(args.n, 2))
+    points = [Point(x, y) for x, y in coords.tolist()]
+
+    match(args.engine):
+        case "graham":
+            hull, sorted_points = graham_convex_hull(points, args.backend)
+
+            plot_points(sorted_points, enum=True)
+            plot_pivot_with_lines(sorted_points, enum=True)
+            plot_hull(hull, sorted_points)
+        case "monotone":
+            hull = monotone_chain_hull(coords)
+        case "quickhull":
+            hull = quickhull(coords)
+        case "parallel":
+            hull = parallel_hull(coords, args.workers)
+        case "dynamic":
+            hull = dynamic_hull(coords)
+
+    # The array engines return an (h, 2) hull
+    if args.engine != "graham":
+        plot_hull([Point(x, y) for x, y in hull.tolist()], points)
\ No newline at end of file
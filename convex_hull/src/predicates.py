@@ -0,0 +1,38 @@
+import numpy as np
+
+from fractions import Fraction
+
+# Shewchuk's static error bounds, a float result larger than the bound has the right sign
+EPSILON = 2.0 ** -53
+CCW_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+
+
+def orient2d(ax, ay, bx, by, cx, cy):
+    # Positive if a, b, c turn counterclockwise, negative if clockwise, zero if collinear
+    left = (ax - cx) * (by - cy)
+    right = (ay - cy) * (bx - cx)
+    det = left - right
+
+    if abs(det) >= CCW_BOUND * (abs(left) + abs(right)):
+        return det
+    return _orient2d_exact(ax, ay, bx, by, cx, cy)
+
+
+def orient2d_batch(a: np.ndarray, b: np.ndarray, c: np.ndarray):
+    # Row-wise orient2d of broadcastable (..., 2) arrays, only the uncertain rows are redone exactly
+    a, b, c = np.broadcast_arrays(a, b, c)
+
+    left = (a[..., 0] - c[..., 0]) * (b[..., 1] - c[..., 1])
+    right = (a[..., 1] - c[..., 1]) * (b[..., 0] - c[..., 0])
+    det = left - right
+
+    for k in zip(*np.nonzero(np.abs(det) < CCW_BOUND * (np.abs(left) + np.abs(right)))):
+        det[k] = _orient2d_exact(*a[k].tolist(), *b[k].tolist(), *c[k].tolist())
+
+    return det
+
+
+def _orient2d_exact(ax, ay, bx, by, cx, cy):
+    # Floats convert to fractions exactly, so the determinant is evaluated without any rounding
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    return float((ax - cx) * (by - cy) - (ay - cy) * (bx - cx))
\ No newline at end of file
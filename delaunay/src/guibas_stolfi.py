@@ -0,0 +1,263 @@
+import numpy as np
+
+from array import array
+from functools import cmp_to_key
+from concurrent.futures import ProcessPoolExecutor
+
+from predicates import orient2d, incircle
+
+# Slabs smaller than this aren't worth a process of their own
+MIN_SLAB = 64
+
+
+def rot(e: int):
+    return (e & ~3) | ((e + 1) & 3)
+
+
+def rot_inv(e: int):
+    return (e & ~3) | ((e + 3) & 3)
+
+
+def sym(e: int):
+    return e ^ 2
+
+
+# Guibas-Stolfi quad-edge structure in flat arrays, edge e, rot(e), sym(e) and rot_inv(e) share a block of four
+class QuadEdge:
+    __slots__ = ("xs", "ys", "onext", "org", "alive")
+
+    def __init__(self, points: np.ndarray):
+        self.xs = points[:, 0].tolist()
+        self.ys = points[:, 1].tolist()
+
+        self.onext = array("i")
+
+        # Vertex at the origin of every primal edge, -1 for the dual ones
+        self.org = array("i")
+        self.alive = []
+
+    def make_edge(self, a: int, b: int):
+        e = len(self.onext)
+        self.onext.extend((e, e + 3, e + 2, e + 1))
+        self.org.extend((a, -1, b, -1))
+        self.alive.append(True)
+        return e
+
+    def splice(self, a: int, b: int):
+        onext = self.onext
+        alpha, beta = rot(onext[a]), rot(onext[b])
+        onext[a], onext[b] = onext[b], onext[a]
+        onext[alpha], onext[beta] = onext[beta], onext[alpha]
+
+    def connect(self, a: int, b: int):
+        # New edge from the destination of a to the origin of b, in the face left of both
+        e = self.make_edge(self.dest(a), self.org[b])
+        self.splice(e, self.lnext(a))
+        self.splice(sym(e), b)
+        return e
+
+    def delete(self, e: int):
+        self.splice(e, self.oprev(e))
+        self.splice(sym(e), self.oprev(sym(e)))
+        self.alive[e >> 2] = False
+
+    def dest(self, e: int):
+        return self.org[e ^ 2]
+
+    def oprev(self, e: int):
+        return rot(self.onext[rot(e)])
+
+    def lnext(self, e: int):
+        return rot(self.onext[rot_inv(e)])
+
+    def rprev(self, e: int):
+        return self.onext[e ^ 2]
+
+    def ccw(self, a: int, b: int, c: int):
+        xs, ys = self.xs, self.ys
+        return orient2d(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c]) > 0
+
+    def in_circle(self, a: int, b: int, c: int, d: int):
+        xs, ys = self.xs, self.ys
+        return incircle(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c], xs[d], ys[d]) > 0
+
+    def build(self, lo: int, hi: int):
+        # Triangulates the lexicographically sorted vertices lo..hi-1, returns the counterclockwise hull edge
+        # out of the leftmost vertex and the clockwise one out of the rightmost
+        n = hi - lo
+
+        if n == 2:
+            a = self.make_edge(lo, lo + 1)
+            return a, sym(a)
+
+        if n == 3:
+            a = self.make_edge(lo, lo + 1)
+            b = self.make_edge(lo + 1, lo + 2)
+            self.splice(sym(a), b)
+
+            if self.ccw(lo, lo + 1, lo + 2):
+                self.connect(b, a)
+                return a, sym(b)
+            if self.ccw(lo, lo + 2, lo + 1):
+                c = self.connect(b, a)
+                return sym(c), c
+            return a, sym(b)
+
+        mid = (lo + hi) // 2
+        return self.merge(self.build(lo, mid), self.build(mid, hi))
+
+    def merge(self, left: tuple, right: tuple):
+        ldo, ldi = left
+        rdi, rdo = right
+        org, onext, dest = self.org, self.onext, self.dest
+        ccw, in_circle = self.ccw, self.in_circle
+
+        # Lower common tangent of the two hulls
+        while True:
+            if ccw(org[rdi], org[ldi], dest(ldi)):
+                ldi = self.lnext(ldi)
+            elif ccw(org[ldi], dest(rdi), org[rdi]):
+                rdi = self.rprev(rdi)
+            else:
+                break
+
+        basel = self.connect(sym(rdi), ldi)
+        if org[ldi] == org[ldo]:
+            ldo = sym(basel)
+        if org[rdi] == org[rdo]:
+            rdo = basel
+
+        # Zip the two halves together bottom up, deleting left and right edges that lose the in-circle test. Once the
+        # next candidate wraps around to the base itself its end is a base vertex, never strictly inside, so the test is skipped
+        while True:
+            bo, bd = org[basel], org[basel ^ 2]
+
+            lcand = onext[basel ^ 2]
+            if ccw(org[lcand ^ 2], bd, bo):
+                while org[onext[lcand] ^ 2] != bo and in_circle(bd, bo, org[lcand ^ 2], org[onext[lcand] ^ 2]):
+                    t = onext[lcand]
+                    self.delete(lcand)
+                    lcand = t
+
+            rcand = self.oprev(basel)
+            if ccw(org[rcand ^ 2], bd, bo):
+                while org[self.oprev(rcand) ^ 2] != bd and in_circle(bd, bo, org[rcand ^ 2], org[self.oprev(rcand) ^ 2]):
+                    t = self.oprev(rcand)
+                    self.delete(rcand)
+                    rcand = t
+
+            left_valid = ccw(org[lcand ^ 2], bd, bo)
+            right_valid = ccw(org[rcand ^ 2], bd, bo)
+
+            if not left_valid and not right_valid:
+                return ldo, rdo
+
+            if not left_valid or (right_valid and in_circle(org[lcand ^ 2], org[lcand], org[rcand], org[rcand ^ 2])):
+                basel = self.connect(rcand, sym(basel))
+            else:
+                basel = self.connect(sym(basel), sym(lcand))
+
+    def edges(self):
+        org, alive = self.org, self.alive
+        return np.array([(org[e], org[e + 2]) for e in range(0, len(org), 4) if alive[e >> 2]], dtype=np.int64).reshape(-1, 2)
+
+    def from_edges(self, edges: np.ndarray):
+        # Rebuilds the subdivision of a planar straight line graph by splicing every vertex's edges in angular order
+        xs, ys = self.xs, self.ys
+        rings = {}
+
+        for a, b in edges.tolist():
+            e = self.make_edge(a, b)
+            rings.setdefault(a, []).append(e)
+            rings.setdefault(b, []).append(sym(e))
+
+        for v, ring in rings.items():
+            def counterclockwise(e, f):
+                a, b = self.dest(e), self.dest(f)
+                half_a, half_b = self.__half(v, a), self.__half(v, b)
+                if half_a != half_b:
+                    return half_a - half_b
+                return -1 if orient2d(xs[v], ys[v], xs[a], ys[a], xs[b], ys[b]) > 0 else 1
+
+            ring.sort(key=cmp_to_key(counterclockwise))
+            for e, f in zip(ring, ring[1:]):
+                self.splice(e, f)
+
+        return rings
+
+    def hull_edges(self, rings: dict, lo: int, hi: int):
+        # The (ldo, rdo) pair build() would have returned for vertices lo..hi-1
+        xs, ys = self.xs, self.ys
+
+        def extreme(v, turn):
+            best = rings[v][0]
+            for e in rings[v][1:]:
+                a, b = self.dest(best), self.dest(e)
+                if orient2d(xs[v], ys[v], xs[a], ys[a], xs[b], ys[b]) * turn > 0:
+                    best = e
+            return best
+
+        # Most clockwise edge out of the leftmost vertex, most counterclockwise out of the rightmost
+        return extreme(lo, -1), extreme(hi - 1, 1)
+
+    def triangles(self):
+        org, alive, lnext = self.org, self.alive, self.lnext
+        found = []
+
+        for e in range(0, len(org), 2):
+            if not alive[e >> 2]:
+                continue
+
+            # Report every face once, from its lowest edge, and skip the outer face
+            f = lnext(e)
+            g = lnext(f)
+            if lnext(g) == e and e < f and e < g and self.ccw(org[e], org[f], org[g]):
+                found.append((org[e], org[f], org[g]))
+
+        return np.array(found, dtype=np.int32).reshape(-1, 3)
+
+    def __half(self, v: int, w: int):
+        # 0 for directions in [0, pi), 1 for [pi, 2 pi)
+        dx, dy = self.xs[w] - self.xs[v], self.ys[w] - self.ys[v]
+        return 0 if dy > 0 or (dy == 0 and dx > 0) else 1
+
+
+def _slab_edges(points: np.ndarray):
+    quad = QuadEdge(points)
+    quad.build(0, len(points))
+    return quad.edges()
+
+
+def divide_and_conquer(points: np.ndarray, workers: int=None):
+    # Returns the unique points in lexicographic order and their triangles
+    vertices = np.unique(np.asarray(points, dtype=np.float64).reshape(-1, 2), axis=0)
+    n = len(vertices)
+
+    if n < 3:
+        return vertices, np.empty((0, 3), dtype=np.int32)
+
+    workers = min(workers or 1, n // MIN_SLAB)
+    quad = QuadEdge(vertices)
+
+    if workers <= 1:
+        quad.build(0, n)
+        return vertices, quad.triangles()
+
+    # Vertical slabs are triangulated in their own processes and come back as edge lists
+    bounds = np.linspace(0, n, workers + 1).astype(np.int64).tolist()
+    slabs = list(zip(bounds[:-1], bounds[1:]))
+
+    with ProcessPoolExecutor(workers) as pool:
+        parts = list(pool.map(_slab_edges, [vertices[lo:hi] for lo, hi in slabs]))
+
+    rings = quad.from_edges(np.concatenate([edges + lo for edges, (lo, _) in zip(parts, slabs)]))
+    hulls = [quad.hull_edges(rings, lo, hi) for lo, hi in slabs]
+
+    # Merge neighbouring slabs pairwise until one triangulation is left
+    while len(hulls) > 1:
+        merged = [quad.merge(hulls[k], hulls[k + 1]) for k in range(0, len(hulls) - 1, 2)]
+        if len(hulls) % 2:
+            merged.append(hulls[-1])
+        hulls = merged
+
+    return vertices, quad.triangles()
\ No newline at end of file
@@ -1,15 +1,19 @@
 import sys
-import math
+import argparse
 import time
-import random
 import numpy as np
 import matplotlib.pyplot as plt
 
-from collections import defaultdict
+from matplotlib.collections import PolyCollection
+
+from spatial_sort import ORDERS
+from guibas_stolfi import divide_and_conquer
+from mesh import circumcircles
+from streaming import CHUNK_SIZE, TILE_SIZE, stream_triangulate
+from triangulation import DelaunayTriangulation
 
 RAND_LIMIT = (-1.0, 1.0)
 PLOT_LIMIT = (-1.2, 1.2)
-EPS = 1e-10
 
 def profiler(func):
     def wrapper(*args, **kwargs):
@@ -22,144 +26,113 @@ def profiler(func):
     return wrapper
 
 
-class Point:
-    def __init__(self, x: float, y: float):
-        self.x = x
-        self.y = y
-
-    def __eq__(self, other):
-        return abs(self.x - other.x) < EPS and abs(self.y - other.y) < EPS
-
-    def __hash__(self):
-        return hash((self.x, self.y))
-
-
-class Edge:
-    def __init__(self, p1: Point, p2: Point):
-        if (p1.x, p1.y) < (p2.x, p2.y):
-            self.p1, self.p2 = p1, p2
-        else:
-            self.p1, self.p2 = p2, p1
-
-    def __eq__(self, other):
-        return self.p1 == other.p1 and self.p2 == other.p2
-
-    def __hash__(self):
-        return hash((self.p1, self.p2))
-
-
-class Triangle:
-    def __init__(self, p1: Point, p2: Point, p3: Point):
-        if self._orientation(p1, p2, p3) < EPS:
-            p2, p3 = p3, p2
-
-        self.p1 = p1
-        self.p2 = p2
-        self.p3 = p3
-
-        self.edges = [Edge(p1, p2), Edge(p2, p3), Edge(p3, p1)]
-
-    def _orientation(self, a, b, c):
-        return (b.x - a.x) * (c.y - a.y) - (b.y - a.y) * (c.x - a.x)
+@profiler
+def bowyer_watson(points: np.ndarray, order: str="input"):
+    # One-shot triangulation, the super triangle is sized from the points' bounds
+    triangulation = DelaunayTriangulation()
+    triangulation.insert_many(points, order)
+    return triangulation
 
-    def inside_circumcircle(self, p: Point):
-        ax, ay = self.p1.x - p.x, self.p1.y - p.y
-        bx, by = self.p2.x - p.x, self.p2.y - p.y
-        cx, cy = self.p3.x - p.x, self.p3.y - p.y
 
-        mat = np.array([
-            [ax, ay, ax * ax + ay * ay],
-            [bx, by, bx * bx + by * by],
-            [cx, cy, cx * cx + cy * cy]
-        ])
+@profiler
+def guibas_stolfi(points: np.ndarray, workers: int=None):
+    return divide_and_conquer(points, workers)
 
-        return np.linalg.det(mat) > EPS
-    
-    def circumcircle(self):
-        ax, ay = self.p1.x, self.p1.y
-        bx, by = self.p2.x, self.p2.y
-        cx, cy = self.p3.x, self.p3.y
 
-        d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
-        if abs(d) < EPS:
-            return None, None
+def triangle_set(vertices: np.ndarray, triangles: np.ndarray):
+    # Engine independent form of a triangulation: every triangle as a set of coordinate pairs
+    return {frozenset(map(tuple, corners)) for corners in vertices[triangles].tolist()}
 
-        a2 = ax**2 + ay**2
-        b2 = bx**2 + by**2
-        c2 = cx**2 + cy**2
 
-        ux = (a2 * (by - cy) + b2 * (cy - ay) + c2 * (ay - by)) / d
-        uy = (a2 * (cx - bx) + b2 * (ax - cx) + c2 * (bx - ax)) / d
+def cross_check(points: np.ndarray, vertices: np.ndarray, triangles: np.ndarray):
+    # Bowyer-Watson may lose a few hull triangles to its super triangle, any other difference is a bug
+    reference = triangle_set(*bowyer_watson(points, "brio").to_numpy())
+    result = triangle_set(vertices, triangles)
 
-        radius = math.hypot(ux - ax, uy - ay)
-        return (ux, uy), radius
+    missing = reference - result
+    print(f"Cross-check: {len(reference & result)} shared, {len(missing)} only in Bowyer-Watson, {len(result - reference)} only in divide and conquer")
+    if missing:
+        print("Cross-check failed: divide and conquer lacks Bowyer-Watson triangles")
 
-    def contains_vertex(self, point: Point):
-        return point == self.p1 or point == self.p2 or point == self.p3
 
+def plot_triangulation(vertices, triangles, circumcircle=False, title="Bowyer-Watson", voronoi=None):
+    _, ax = plt.subplots(figsize=(8, 8))
 
-@profiler
-def bowyer_watson(points: list):
-    super_triangle = Triangle(Point(3.0, 0.0), Point(0.0, 3.0), Point(-3.0, -3.0))
-    triangulation = [super_triangle]
+    if voronoi is not None:
+        centres, cells, bounded = voronoi
+        polygons = [centres[cell] for cell, closed in zip(cells, bounded.tolist()) if closed]
+        ax.add_collection(PolyCollection(polygons, facecolor='none', edgecolor='orange', linewidth=0.6))
 
-    for p in points:
-        bad_triangles = [t for t in triangulation if t.inside_circumcircle(p)]
+    # Fewer than three points, or only triangles on the super triangle, leave nothing to draw but the points
+    if len(triangles):
+        ax.triplot(vertices[:, 0], vertices[:, 1], triangles, 'b-', linewidth=0.6)
 
-        edge_count = defaultdict(int)
-        for t in bad_triangles:
-            for edge in t.edges:
-                edge_count[edge] += 1
+    if circumcircle and len(triangles):
+        centres, radii = circumcircles(vertices, triangles)
+        for center, radius in zip(centres.tolist(), radii.tolist()):
+            if np.isfinite(radius):
+                circle = plt.Circle(center, radius, edgecolor='green', fill=False, linestyle='--', linewidth=0.5)
+                ax.add_patch(circle)
 
-        boundary_edges = [e for e, count in edge_count.items() if count == 1]
+    ax.scatter(vertices[:, 0], vertices[:, 1], c='red', s=10)
 
-        for t in bad_triangles:
-            triangulation.remove(t)
+    ax.set_xlim(PLOT_LIMIT)
+    ax.set_ylim(PLOT_LIMIT)
+    ax.set_aspect('equal')
+    ax.set_title(f"Delaunay Triangulation ({title})")
+    plt.show()
 
-        for e in boundary_edges:
-            triangulation.append(Triangle(e.p1, e.p2, p))
 
-    triangles = [
-        t for t in triangulation if not
-        (super_triangle.contains_vertex(t.p1) or super_triangle.contains_vertex(t.p2) or super_triangle.contains_vertex(t.p3))
-    ]
+class HelpOnErrorParser(argparse.ArgumentParser):
+    def error(self, _):
+        self.print_help()
+        sys.exit(2)
 
-    return triangles
 
+def parse_args():
+    parser = HelpOnErrorParser(description="Delaunay Triangulation Parameters")
 
-def plot_triangulation(points, triangles, circumcircle=False):
-    _, ax = plt.subplots(figsize=(8, 8))
+    parser.add_argument("n", type=int, nargs="?", default=3, help="Number of random points (default: 3)")
+    parser.add_argument("--order", choices=ORDERS, default="input", help="Insertion order: as generated, along a Hilbert or Morton curve, or biased randomized rounds in Hilbert order (default: input)")
+    parser.add_argument("--engine", choices=["bowyer-watson", "divide-conquer"], default="bowyer-watson", help="Incremental Bowyer-Watson or Guibas-Stolfi divide and conquer (default: bowyer-watson)")
+    parser.add_argument("--workers", type=int, required=False, help="Divide and conquer: triangulate vertical slabs in this many processes before merging them")
+    parser.add_argument("--seed", type=int, required=False, help="Seed for the random points")
+    parser.add_argument("--input", required=False, help="Stream the points of this CSV (x,y per line) or raw float64 file instead of generating random ones")
+    parser.add_argument("--output", default="triangulation.obj", help="Streaming: OBJ file the triangles are written to (default: triangulation.obj)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help=f"Streaming: points read at a time (default: {CHUNK_SIZE})")
+    parser.add_argument("--tile", type=int, default=TILE_SIZE, help=f"Streaming: target points per tile (default: {TILE_SIZE})")
+    parser.add_argument("--voronoi", action="store_true", help="Bowyer-Watson: draw the bounded Voronoi cells of the points as well")
+    parser.add_argument("--check", action="store_true", help="Divide and conquer: compare the result with Bowyer-Watson on the same points")
 
-    for triangle in triangles:
-        xs = [triangle.p1.x, triangle.p2.x, triangle.p3.x, triangle.p1.x]
-        ys = [triangle.p1.y, triangle.p2.y, triangle.p3.y, triangle.p1.y]
-        ax.plot(xs, ys, 'b-', linewidth=0.6)
+    return parser.parse_args()
 
-        if circumcircle:
-            center, radius = triangle.circumcircle()
-            if center and radius:
-                circle = plt.Circle(center, radius, edgecolor='green', fill=False, linestyle='--', linewidth=0.5)
-                ax.add_patch(circle)
 
-    ax.scatter([p.x for p in points], [p.y for p in points], c='red', s=10)
+if __name__ == '__main__':
+    args = parse_args()
 
-    ax.set_xlim(PLOT_LIMIT)
-    ax.set_ylim(PLOT_LIMIT)
-    ax.set_aspect('equal')
-    ax.set_title("Delaunay Triangulation (Bowyer-Watson)")
-    plt.show()
+    if args.input:
+        vertices, triangles, peak = stream_triangulate(args.input, args.output, args.chunk, args.tile)
+        print(f"Wrote {vertices} vertices and {triangles} triangles to {args.output}, at most {peak} triangles were held in memory")
+        sys.exit(0)
 
+    points = np.random.default_rng(args.seed).uniform(*RAND_LIMIT, size=(args.n, 2))
 
-if __name__ == '__main__':
-    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    # Duplicate points only appear once in either result
+    voronoi = None
 
-    points = [
-        Point(random.uniform(*RAND_LIMIT), random.uniform(*RAND_LIMIT))
-        for _ in range(n)
-    ]
+    match(args.engine):
+        case "bowyer-watson":
+            triangulation = bowyer_watson(points, args.order)
+            vertices, triangles = triangulation.to_numpy()
+            title = "Bowyer-Watson"
 
-    points = list(set(points))
+            if args.voronoi:
+                voronoi = triangulation.voronoi()
+        case "divide-conquer":
+            vertices, triangles = guibas_stolfi(points, args.workers)
+            title = "Guibas-Stolfi"
 
-    triangles = bowyer_watson(points)
+            if args.check:
+                cross_check(points, vertices, triangles)
 
-    plot_triangulation(points, triangles)
+    plot_triangulation(vertices, triangles, title=title, voronoi=voronoi)
\ No newline at end of file
@@ -0,0 +1,147 @@
+import math
+import numpy as np
+
+from array import array
+
+# Triangle slot k in the flat arrays sits at 3 * t + k
+NEXT = (1, 2, 0)
+PREV = (2, 0, 1)
+
+EPS = 1e-10
+NAN, INF = math.nan, math.inf
+
+# Negative error bound of a triangle whose circle isn't computed yet
+STALE = -1.0
+UNCACHED = (NAN, NAN, NAN, STALE)
+
+# Generous multiple of the unit roundoff covering the cached circumcircles' floating point error
+CIRCLE_ERROR = 64 * 2.0 ** -53
+
+# Index based triangle mesh in flat typed arrays, 16 bytes per vertex and 56 per triangle
+class TriangleMesh:
+    __slots__ = ("coords", "tri", "nbr", "circles", "count", "_free")
+
+    def __init__(self):
+        # x0, y0, x1, y1, ...
+        self.coords = array("d")
+
+        # Counterclockwise vertex indices, a dead triangle has -1 as its first vertex
+        self.tri = array("i")
+
+        # nbr[3 * t + k] shares the edge opposite vertex k of t, -1 on the hull
+        self.nbr = array("i")
+
+        # Centre x, centre y, squared radius and the error bound of distances against it, per triangle,
+        # filled in by cache_circle the first time the triangle is tested
+        self.circles = array("d")
+
+        self.count = 0
+        self._free = []
+
+    def __len__(self):
+        return self.count
+
+    def add_vertex(self, x: float, y: float):
+        self.coords.append(x)
+        self.coords.append(y)
+        return len(self.coords) // 2 - 1
+
+    def add_triangle(self, a: int, b: int, c: int):
+        self.count += 1
+
+        if self._free:
+            t = self._free.pop()
+            s = 3 * t
+            tri, nbr = self.tri, self.nbr
+            tri[s], tri[s + 1], tri[s + 2] = a, b, c
+            nbr[s] = nbr[s + 1] = nbr[s + 2] = -1
+            self.circles[4 * t + 3] = STALE
+            return t
+
+        self.tri.extend((a, b, c))
+        self.nbr.extend((-1, -1, -1))
+        self.circles.extend(UNCACHED)
+        return len(self.tri) // 3 - 1
+
+    def remove_triangle(self, t: int):
+        self.count -= 1
+        self.tri[3 * t] = -1
+        self._free.append(t)
+
+    def alive(self, t: int):
+        return self.tri[3 * t] >= 0
+
+    def cache_circle(self, t: int):
+        coords, tri, circles = self.coords, self.tri, self.circles
+        a, b, c = 2 * tri[3 * t], 2 * tri[3 * t + 1], 2 * tri[3 * t + 2]
+        s = 4 * t
+
+        # Relative to a, which keeps the precision of far away coordinates
+        ax, ay = coords[a], coords[a + 1]
+        bx, by = coords[b] - ax, coords[b + 1] - ay
+        cx, cy = coords[c] - ax, coords[c + 1] - ay
+
+        d = 2 * (bx * cy - by * cx)
+        if d == 0:
+            # Collinear corners, every comparison against NaN fails and falls through to the exact test
+            circles[s + 2], circles[s + 3] = NAN, INF
+            return
+
+        b2 = bx * bx + by * by
+        c2 = cx * cx + cy * cy
+        ux = (cy * b2 - by * c2) / d
+        uy = (bx * c2 - cx * b2) / d
+        r2 = ux * ux + uy * uy
+
+        # Absolute error of the centre: the numerators' magnitude over d, amplified by the cancellation in d for
+        # needle-like triangles, plus the magnitudes it is offset by and later compared at
+        ox, oy = ax + ux, ay + uy
+        radius = math.sqrt(r2)
+        nb, nc, nd = abs(bx) + abs(by), abs(cx) + abs(cy), abs(d)
+        error = CIRCLE_ERROR * ((nc * b2 + nb * c2) / nd * (1 + 2 * nb * nc / nd) + abs(ox) + abs(oy) + radius)
+
+        circles[s], circles[s + 1], circles[s + 2] = ox, oy, r2
+        circles[s + 3] = (2 * radius + error) * error + CIRCLE_ERROR * r2
+
+    def vertex(self, v: int):
+        return self.coords[2 * v], self.coords[2 * v + 1]
+
+    def link(self, t: int, old: int, new: int):
+        # Repoints whichever edge of t faced old
+        s = 3 * t
+        nbr = self.nbr
+        for k in range(s, s + 3):
+            if nbr[k] == old:
+                nbr[k] = new
+                return
+
+    def to_numpy(self, first_vertex: int=0):
+        # Copies of the live mesh, vertices before first_vertex (e.g. a super triangle) are dropped along with their triangles
+        vertices = np.frombuffer(self.coords, dtype=np.float64).reshape(-1, 2)[first_vertex:].copy()
+
+        triangles = np.frombuffer(self.tri, dtype=np.intc).reshape(-1, 3)
+        keep = (triangles >= first_vertex).all(axis=1)
+
+        return vertices, (triangles[keep] - first_vertex).astype(np.int32)
+
+
+def circumcircles(vertices: np.ndarray, triangles: np.ndarray):
+    # Centres and radii of every triangle at once, NaN for degenerate ones
+    a = vertices[triangles[:, 0]]
+
+    # Relative to the first corner, which keeps the precision of far away coordinates
+    b = vertices[triangles[:, 1]] - a
+    c = vertices[triangles[:, 2]] - a
+    bx, by = b[:, 0], b[:, 1]
+    cx, cy = c[:, 0], c[:, 1]
+
+    d = 2 * (bx * cy - by * cx)
+    d = np.where(np.abs(d) < EPS, np.nan, d)
+
+    b2 = bx**2 + by**2
+    c2 = cx**2 + cy**2
+
+    ux = (cy * b2 - by * c2) / d
+    uy = (bx * c2 - cx * b2) / d
+
+    return a + np.stack((ux, uy), axis=1), np.hypot(ux, uy)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import numpy as np
+
+from fractions import Fraction
+
+# Shewchuk's static error bounds, a float result larger than the bound has the right sign
+EPSILON = 2.0 ** -53
+CCW_BOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+ICC_BOUND = (10.0 + 96.0 * EPSILON) * EPSILON
+
+
+def orient2d(ax, ay, bx, by, cx, cy):
+    # Positive if a, b, c turn counterclockwise, negative if clockwise, zero if collinear
+    left = (ax - cx) * (by - cy)
+    right = (ay - cy) * (bx - cx)
+    det = left - right
+
+    if abs(det) >= CCW_BOUND * (abs(left) + abs(right)):
+        return det
+    return _orient2d_exact(ax, ay, bx, by, cx, cy)
+
+
+def incircle(ax, ay, bx, by, cx, cy, dx, dy):
+    # Positive if d lies inside the circle through the counterclockwise a, b, c, zero if on it
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+
+    det = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    permanent = (
+        (abs(bdxcdy) + abs(cdxbdy)) * alift +
+        (abs(cdxady) + abs(adxcdy)) * blift +
+        (abs(adxbdy) + abs(bdxady)) * clift
+    )
+
+    if abs(det) > ICC_BOUND * permanent:
+        return det
+    return _incircle_exact(ax, ay, bx, by, cx, cy, dx, dy)
+
+
+def orient2d_batch(a: np.ndarray, b: np.ndarray, c: np.ndarray):
+    # Row-wise orient2d of broadcastable (..., 2) arrays, only the uncertain rows are redone exactly
+    a, b, c = np.broadcast_arrays(a, b, c)
+
+    left = (a[..., 0] - c[..., 0]) * (b[..., 1] - c[..., 1])
+    right = (a[..., 1] - c[..., 1]) * (b[..., 0] - c[..., 0])
+    det = left - right
+
+    for k in zip(*np.nonzero(np.abs(det) < CCW_BOUND * (np.abs(left) + np.abs(right)))):
+        det[k] = _orient2d_exact(*a[k].tolist(), *b[k].tolist(), *c[k].tolist())
+
+    return det
+
+
+def incircle_batch(a: np.ndarray, b: np.ndarray, c: np.ndarray, d: np.ndarray):
+    a, b, c, d = np.broadcast_arrays(a, b, c, d)
+
+    ad, bd, cd = a - d, b - d, c - d
+    adx, ady = ad[..., 0], ad[..., 1]
+    bdx, bdy = bd[..., 0], bd[..., 1]
+    cdx, cdy = cd[..., 0], cd[..., 1]
+
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+
+    det = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    permanent = (
+        (np.abs(bdxcdy) + np.abs(cdxbdy)) * alift +
+        (np.abs(cdxady) + np.abs(adxcdy)) * blift +
+        (np.abs(adxbdy) + np.abs(bdxady)) * clift
+    )
+
+    for k in zip(*np.nonzero(np.abs(det) <= ICC_BOUND * permanent)):
+        det[k] = _incircle_exact(*a[k].tolist(), *b[k].tolist(), *c[k].tolist(), *d[k].tolist())
+
+    return det
+
+
+def _orient2d_exact(ax, ay, bx, by, cx, cy):
+    # Floats convert to fractions exactly, so the determinant is evaluated without any rounding
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    return float((ax - cx) * (by - cy) - (ay - cy) * (bx - cx))
+
+
+def _incircle_exact(ax, ay, bx, by, cx, cy, dx, dy):
+    ax, ay, bx, by, cx, cy, dx, dy = map(Fraction, (ax, ay, bx, by, cx, cy, dx, dy))
+
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+
+    return float(alift * (bdx * cdy - cdx * bdy) + blift * (cdx * ady - adx * cdy) + clift * (adx * bdy - bdx * ady))
\ No newline at end of file
@@ -0,0 +1,76 @@
+import numpy as np
+
+ORDERS = ("input", "hilbert", "morton", "brio")
+
+# Resolution of the integer grid the curves are laid on
+BITS = 16
+
+
+def _quantize(points: np.ndarray, bits: int):
+    lo = points.min(axis=0)
+    span = np.maximum(points.max(axis=0) - lo, np.finfo(np.float64).tiny)
+
+    cells = (points - lo) / span * ((1 << bits) - 1)
+    cells = cells.astype(np.uint64)
+    return cells[:, 0], cells[:, 1]
+
+
+def hilbert_keys(points: np.ndarray, bits: int=BITS):
+    x, y = _quantize(points, bits)
+    side = np.uint64((1 << bits) - 1)
+    keys = np.zeros(len(points), dtype=np.uint64)
+
+    # Quadrant by quadrant from the top bit down, rotating the frame so each quadrant's curve joins the next one
+    for level in range(bits - 1, -1, -1):
+        s = np.uint64(1 << level)
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        keys += s * s * ((3 * rx) ^ ry).astype(np.uint64)
+
+        flip = ~ry & rx
+        x = np.where(flip, side - x, x)
+        y = np.where(flip, side - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+
+    return keys
+
+
+def morton_keys(points: np.ndarray, bits: int=BITS):
+    x, y = _quantize(points, bits)
+    return _spread(x) | (_spread(y) << np.uint64(1))
+
+
+def _spread(v: np.ndarray):
+    # Moves bit k of a 16 bit value to bit 2k
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+    return v
+
+
+def brio_keys(points: np.ndarray, rng: np.random.Generator=None):
+    # Biased randomized insertion order: every point survives into each earlier round with probability 1/2
+    rng = rng if rng is not None else np.random.default_rng()
+    rounds = np.floor(-np.log2(1.0 - rng.random(len(points)))).astype(np.int64)
+    return rounds, hilbert_keys(points)
+
+
+def spatial_order(points: np.ndarray, order: str="hilbert", rng: np.random.Generator=None):
+    # Permutation of the points for insertion, consecutive points end up close to each other
+    if order != "input" and len(points) < 2:
+        return np.arange(len(points))
+
+    match(order):
+        case "input":
+            return np.arange(len(points))
+        case "hilbert":
+            return np.argsort(hilbert_keys(points), kind="stable")
+        case "morton":
+            return np.argsort(morton_keys(points), kind="stable")
+        case "brio":
+            # Sparse early rounds first, curve order within each round
+            rounds, keys = brio_keys(points, rng)
+            return np.lexsort((keys, -rounds))
+        case _:
+            raise ValueError(f"Invalid order: {order}")
\ No newline at end of file
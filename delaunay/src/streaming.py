@@ -0,0 +1,178 @@
+import os
+import math
+import tempfile
+import numpy as np
+
+from itertools import islice
+
+from mesh import circumcircles
+from triangulation import DelaunayTriangulation, SUPER_VERTICES
+
+# Points read from the input at a time, and roughly per tile
+CHUNK_SIZE = 1_000_000
+TILE_SIZE = 100_000
+
+# Anything else is read as raw little-endian float64 x, y pairs
+TEXT_FORMATS = (".csv", ".txt")
+
+# Points kept in memory to place the tile cuts
+SAMPLE_SIZE = 1 << 16
+
+# Relative safety margin on circumcircle bounds, which are computed in floating point
+SLACK = 1e-9
+
+
+def read_chunks(path: str, chunk_size: int=CHUNK_SIZE):
+    # Yields the points in the file as (k, 2) arrays without ever holding all of them
+    if os.path.splitext(path)[1].lower() in TEXT_FORMATS:
+        with open(path) as f:
+            while True:
+                lines = list(islice(f, chunk_size))
+                if not lines:
+                    return
+                yield np.loadtxt(lines, delimiter=",", usecols=(0, 1), ndmin=2)
+    else:
+        with open(path, "rb") as f:
+            while True:
+                chunk = np.fromfile(f, dtype="<f8", count=2 * chunk_size)
+                if not len(chunk):
+                    return
+                yield chunk.reshape(-1, 2)
+
+
+class TileGrid:
+    # Tiles of roughly equal point counts: x-slabs cut at quantiles of the whole input, then y-cuts at quantiles of
+    # each slab, both estimated from a uniform sample, so clustered input doesn't pile up in a few tiles
+    def __init__(self, path: str, directory: str, chunk_size: int=CHUNK_SIZE, tile_size: int=TILE_SIZE, rng: np.random.Generator=None):
+        self._directory = directory
+        rng = rng if rng is not None else np.random.default_rng()
+
+        # First pass: count, bounds and a bottom-k sample, the SAMPLE_SIZE points with the smallest random keys
+        self.count = 0
+        lo, hi = np.full(2, np.inf), np.full(2, -np.inf)
+        sample, keys = np.empty((0, 2)), np.empty(0)
+
+        for chunk in read_chunks(path, chunk_size):
+            self.count += len(chunk)
+            lo = np.minimum(lo, chunk.min(axis=0))
+            hi = np.maximum(hi, chunk.max(axis=0))
+
+            sample = np.concatenate((sample, chunk))
+            keys = np.concatenate((keys, rng.random(len(chunk))))
+            if len(keys) > SAMPLE_SIZE:
+                keep = np.argpartition(keys, SAMPLE_SIZE)[:SAMPLE_SIZE]
+                sample, keys = sample[keep], keys[keep]
+
+        self.bounds = (*lo.tolist(), *hi.tolist())
+        self.side = side = max(1, math.ceil(math.sqrt(self.count / tile_size)))
+
+        levels = np.arange(1, side) / side
+        self._x_cuts = np.quantile(sample[:, 0], levels) if len(sample) else np.zeros(side - 1)
+
+        slabs = np.searchsorted(self._x_cuts, sample[:, 0], side="right")
+        self._y_cuts = np.zeros((side, side - 1))
+        for slab in range(side):
+            ys = sample[slabs == slab, 1]
+            if len(ys):
+                self._y_cuts[slab] = np.quantile(ys, levels)
+
+        # Second pass: bucket every chunk into per tile files
+        for chunk in read_chunks(path, chunk_size):
+            tiles = self.tile_of(chunk)
+            order = np.argsort(tiles, kind="stable")
+            keys, starts = np.unique(tiles[order], return_index=True)
+
+            for tile, members in zip(keys.tolist(), np.split(order, starts[1:])):
+                with open(self.__path(tile), "ab") as f:
+                    chunk[members].astype("<f8").tofile(f)
+
+    def tile_of(self, points: np.ndarray):
+        slabs = np.searchsorted(self._x_cuts, points[:, 0], side="right")
+        cells = np.empty(len(points), dtype=np.int64)
+
+        for slab in np.unique(slabs).tolist():
+            members = slabs == slab
+            cells[members] = np.searchsorted(self._y_cuts[slab], points[members, 1], side="right")
+
+        return slabs * self.side + cells
+
+    def read(self, slab: int, cell: int):
+        path = self.__path(slab * self.side + cell)
+        if not os.path.exists(path):
+            return np.empty((0, 2))
+        return np.fromfile(path, dtype="<f8").reshape(-1, 2)
+
+    def snake(self):
+        # Slabs left to right, alternating direction, so consecutive tiles always share an edge
+        for slab in range(self.side):
+            cells = range(self.side) if slab % 2 == 0 else range(self.side - 1, -1, -1)
+            for cell in cells:
+                yield slab, cell
+
+    def unreached(self, centres: np.ndarray, radii: np.ndarray, slab: int, cell: int):
+        # True for circles that overlap a tile after (slab, cell) in snake order, where points may still arrive
+        edges = np.concatenate(([-np.inf], self._x_cuts, [np.inf]))
+        cuts = np.concatenate(([-np.inf], self._y_cuts[slab], [np.inf]))
+        r = radii * (1 + SLACK)
+
+        right = centres[:, 0] + r >= edges[slab + 1]
+
+        if slab % 2 == 0:
+            ahead = centres[:, 1] + r >= cuts[cell + 1]
+        else:
+            ahead = centres[:, 1] - r <= cuts[cell]
+
+        in_slab = centres[:, 0] + r >= edges[slab]
+        return right | (in_slab & ahead) | np.isnan(r)
+
+    def __path(self, tile: int):
+        return os.path.join(self._directory, f"{tile}.bin")
+
+
+def finished_triangles(triangulation: DelaunayTriangulation):
+    # Live triangles without super triangle corners, with their circumcircles
+    mesh = triangulation.mesh
+    tri = np.frombuffer(mesh.tri, dtype=np.intc).reshape(-1, 3)
+    ids = np.flatnonzero((tri >= SUPER_VERTICES).all(axis=1))
+    corners = tri[ids]
+
+    # Fancy indexing copies, so no view keeps the mesh buffers from growing
+    centres, radii = circumcircles(np.frombuffer(mesh.coords, dtype=np.float64).reshape(-1, 2), corners)
+    return ids, corners, centres, radii
+
+
+def stream_triangulate(path: str, output: str, chunk_size: int=CHUNK_SIZE, tile_size: int=TILE_SIZE, workdir: str=None):
+    # Writes the Delaunay triangulation of the points in path to an OBJ file, holding only the unfinished front in memory
+    with tempfile.TemporaryDirectory(dir=workdir) as directory:
+        grid = TileGrid(path, directory, chunk_size, tile_size)
+        triangulation = DelaunayTriangulation(grid.bounds)
+        mesh = triangulation.mesh
+
+        vertices = triangles = peak = 0
+        tiles = list(grid.snake())
+
+        with open(output, "w") as out:
+            for step, (slab, cell) in enumerate(tiles):
+                points = grid.read(slab, cell)
+                triangulation.insert_many(points, "hilbert")
+
+                # OBJ indices are 1-based and count vertex lines, which follow the mesh's own vertex order
+                total = len(mesh.coords) // 2 - SUPER_VERTICES
+                fresh = mesh.coords[2 * (SUPER_VERTICES + vertices):].tolist()
+                out.writelines(f"v {x!r} {y!r} 0\n" for x, y in zip(fresh[0::2], fresh[1::2]))
+                vertices = total
+
+                peak = max(peak, len(mesh))
+
+                ids, corners, centres, radii = finished_triangles(triangulation)
+                if step < len(tiles) - 1:
+                    done = ~grid.unreached(centres, radii, slab, cell)
+                    ids, corners = ids[done], corners[done]
+
+                corners = corners - SUPER_VERTICES + 1
+                out.writelines(f"f {a} {b} {c}\n" for a, b, c in corners.tolist())
+                triangles += len(corners)
+
+                triangulation.release(ids.tolist())
+
+    return vertices, triangles, peak
\ No newline at end of file
@@ -0,0 +1,468 @@
+import random
+import numpy as np
+
+from array import array
+from bisect import bisect_left, insort
+from collections import deque
+
+from mesh import TriangleMesh, NEXT, PREV, circumcircles
+from predicates import orient2d, incircle
+from spatial_sort import spatial_order
+
+# Counterclockwise super triangle around the centre of the covered box, in units of the box's half size
+SUPER_SHAPE = ((3.0, 0.0), (0.0, 3.0), (-3.0, -3.0))
+SUPER_SCALE = 10.0
+
+# The super triangle always owns the first vertex indices
+SUPER_VERTICES = len(SUPER_SHAPE)
+
+# Neighbour of an edge whose other side was released, it is never crossed or opened again
+CLOSED = -2
+
+
+def inside_circumcircle(mesh: TriangleMesh, t: int, px: float, py: float):
+    # Distance to the cached circumcentre first, the exact predicate only settles points close to the circle
+    circles = mesh.circles
+    s = 4 * t
+    if circles[s + 3] < 0:
+        mesh.cache_circle(t)
+
+    dx, dy = px - circles[s], py - circles[s + 1]
+    dist = dx * dx + dy * dy
+
+    if dist < circles[s + 2] - circles[s + 3]:
+        return True
+    if dist > circles[s + 2] + circles[s + 3]:
+        return False
+
+    coords, tri = mesh.coords, mesh.tri
+    a, b, c = 2 * tri[3 * t], 2 * tri[3 * t + 1], 2 * tri[3 * t + 2]
+
+    return incircle(coords[a], coords[a + 1], coords[b], coords[b + 1], coords[c], coords[c + 1], px, py) > 0
+
+
+def locate(mesh: TriangleMesh, start: int, px: float, py: float):
+    # Visibility walk: step through any edge that has p on its outer side
+    coords, tri, nbr = mesh.coords, mesh.tri, mesh.nbr
+    t = start
+
+    while True:
+        # Random first edge so the walk can't cycle on degenerate input
+        first = random.randrange(3)
+
+        for k in (first, NEXT[first], PREV[first]):
+            a = 2 * tri[3 * t + NEXT[k]]
+            b = 2 * tri[3 * t + PREV[k]]
+
+            if orient2d(coords[a], coords[a + 1], coords[b], coords[b + 1], px, py) < 0:
+                if nbr[3 * t + k] < 0:
+                    raise ValueError(f"Point ({px}, {py}) lies outside the super triangle")
+                t = nbr[3 * t + k]
+                break
+        else:
+            return t
+
+
+def cavity(mesh: TriangleMesh, start: int, px: float, py: float):
+    # Breadth-first search from the triangle containing p, only bad triangles are ever expanded
+    nbr = mesh.nbr
+    bad = {start}
+    queue = deque([start])
+    boundary = []
+
+    while queue:
+        t = queue.popleft()
+
+        for k in range(3):
+            n = nbr[3 * t + k]
+            if n in bad:
+                continue
+
+            if n >= 0 and inside_circumcircle(mesh, n, px, py):
+                bad.add(n)
+                queue.append(n)
+            else:
+                boundary.append((t, k))
+
+    return bad, boundary
+
+
+class DelaunayTriangulation:
+    def __init__(self, bounds=None):
+        self.mesh = TriangleMesh()
+
+        # One triangle incident to every vertex, -1 once the vertex is removed
+        self._around = array("i")
+
+        # Removed vertex indices in ascending order. Every index the public methods take or return is a row of
+        # to_numpy(), i.e. a vertex index minus the super triangle and the removed vertices before it
+        self._holes = []
+
+        # (xmin, ymin, xmax, ymax) guaranteed to lie inside the super triangle
+        self._box = None
+        self._last = -1
+        self._size = 0
+
+        if bounds is not None:
+            self.__rebuild(tuple(map(float, bounds)))
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, p):
+        # Returns the row of p, the existing one if p is already there
+        x, y = float(p[0]), float(p[1])
+
+        if not self.__covers(x, y):
+            self.__rebuild(self.__grown(x, y, x, y))
+
+        return self.__row(self.__insert(x, y))
+
+    def insert_many(self, points, order: str="hilbert"):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        ids = np.empty(len(points), dtype=np.int64)
+
+        if not len(points):
+            return ids
+
+        # Size the super triangle for the whole batch up front instead of growing it point by point
+        (xmin, ymin), (xmax, ymax) = points.min(axis=0).tolist(), points.max(axis=0).tolist()
+        if not (self.__covers(xmin, ymin) and self.__covers(xmax, ymax)):
+            self.__rebuild(self.__grown(xmin, ymin, xmax, ymax))
+
+        perm = spatial_order(points, order)
+        for k, (x, y) in zip(perm.tolist(), points[perm].tolist()):
+            ids[k] = self.__insert(x, y)
+
+        return self.__rows(ids)
+
+    def remove(self, p):
+        x, y = float(p[0]), float(p[1])
+        v = self.__nearest(x, y, self._last)[0] if self._size else -1
+
+        if v < 0 or self.mesh.vertex(v) != (x, y):
+            raise ValueError(f"Point ({x}, {y}) is not a vertex of the triangulation")
+
+        self.__remove_vertex(v)
+
+    def nearest(self, p):
+        # Row of the vertex closest to p, -1 if the triangulation is empty
+        if not self._size:
+            return -1
+
+        return self.__row(self.__nearest(float(p[0]), float(p[1]), self._last)[0])
+
+    def nearest_many(self, queries):
+        # Rows of the vertices closest to each row of an (m, 2) array, answered in Hilbert order so every walk starts
+        # where the previous query ended
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        found = np.full(len(queries), -1, dtype=np.int64)
+
+        if not self._size or not len(queries):
+            return found
+
+        order = spatial_order(queries)
+        t = self._last
+        for k, (x, y) in zip(order.tolist(), queries[order].tolist()):
+            found[k], t = self.__nearest(x, y, t)
+
+        return self.__rows(found)
+
+    def voronoi(self):
+        # Voronoi cells of the vertices in to_numpy() order, as counterclockwise polygons of indices into the
+        # returned circumcentres. Cells of hull vertices reach the super triangle and are flagged unbounded
+        mesh = self.mesh
+        tri = np.frombuffer(mesh.tri, dtype=np.intc).reshape(-1, 3)
+        live = np.flatnonzero(tri[:, 0] >= 0)
+
+        centres, _ = circumcircles(np.frombuffer(mesh.coords, dtype=np.float64).reshape(-1, 2), tri[live])
+        row = np.full(len(tri), -1, dtype=np.int64)
+        row[live] = np.arange(len(live))
+
+        touches_super = (tri < SUPER_VERTICES).any(axis=1)
+        del tri
+
+        row, touches_super = row.tolist(), touches_super.tolist()
+        cells, bounded = [], []
+
+        for v in range(SUPER_VERTICES, len(self._around)):
+            if self._around[v] < 0:
+                continue
+
+            star = [t for t, _ in self.__star(v)]
+            cells.append(np.array([row[t] for t in star], dtype=np.int64))
+            bounded.append(not any(touches_super[t] for t in star))
+
+        return centres, cells, np.array(bounded, dtype=bool)
+
+    def release(self, triangles):
+        # Forgets triangles that no future insertion can change, e.g. finalised ones in streaming mode.
+        # Vertices of released triangles can't be removed or returned by nearest() anymore
+        mesh = self.mesh
+        nbr = mesh.nbr
+        released = set(triangles)
+        survivor = -1
+
+        for t in released:
+            for s in range(3 * t, 3 * t + 3):
+                n = nbr[s]
+                if n >= 0 and n not in released:
+                    mesh.link(n, t, CLOSED)
+                    survivor = n
+
+        for t in released:
+            mesh.remove_triangle(t)
+
+        if self._last in released:
+            self._last = survivor
+
+    def to_numpy(self):
+        # Live vertices and their triangles without the super triangle, removed vertices are compacted away
+        vertices, triangles = self.mesh.to_numpy(SUPER_VERTICES)
+
+        live = np.frombuffer(self._around, dtype=np.intc)[SUPER_VERTICES:] >= 0
+        remap = np.cumsum(live) - 1
+
+        return vertices[live], remap[triangles].astype(np.int32)
+
+    def __row(self, v: int):
+        return v - SUPER_VERTICES - bisect_left(self._holes, v)
+
+    def __rows(self, ids: np.ndarray):
+        return ids - SUPER_VERTICES - np.searchsorted(np.array(self._holes, dtype=np.int64), ids)
+
+    def __covers(self, x: float, y: float):
+        if self._box is None:
+            return False
+
+        xmin, ymin, xmax, ymax = self._box
+        return xmin <= x <= xmax and ymin <= y <= ymax
+
+    def __grown(self, xmin: float, ymin: float, xmax: float, ymax: float):
+        if self._box is None:
+            return xmin, ymin, xmax, ymax
+
+        xmin, ymin = min(xmin, self._box[0]), min(ymin, self._box[1])
+        xmax, ymax = max(xmax, self._box[2]), max(ymax, self._box[3])
+
+        # Pad by the new size on every side, so a drifting input only rebuilds a logarithmic number of times
+        w, h = xmax - xmin, ymax - ymin
+        return xmin - w, ymin - h, xmax + w, ymax + h
+
+    def __rebuild(self, box):
+        # New super triangle around box, existing vertices keep their indices and are inserted again
+        old = self.mesh
+        xmin, ymin, xmax, ymax = box
+
+        cx, cy = (xmin + xmax) / 2, (ymin + ymax) / 2
+        half = max(xmax - xmin, ymax - ymin) / 2 or 1.0
+
+        mesh = TriangleMesh()
+        for sx, sy in SUPER_SHAPE:
+            mesh.add_vertex(cx + SUPER_SCALE * half * sx, cy + SUPER_SCALE * half * sy)
+        mesh.coords.extend(old.coords[2 * SUPER_VERTICES:])
+
+        live = [v for v in range(SUPER_VERTICES, len(self._around)) if self._around[v] >= 0]
+
+        self.mesh = mesh
+        self._box = box
+        self._around = array("i", [-1]) * (len(mesh.coords) // 2)
+        self._last = mesh.add_triangle(0, 1, 2)
+
+        for v in range(SUPER_VERTICES):
+            self._around[v] = self._last
+
+        if live:
+            coords = np.frombuffer(mesh.coords, dtype=np.float64).reshape(-1, 2)[live]
+            for v in np.array(live)[spatial_order(coords)].tolist():
+                x, y = mesh.vertex(v)
+                self.__place(v, locate(mesh, self._last, x, y), x, y)
+
+    def __insert(self, x: float, y: float):
+        mesh = self.mesh
+        coords, tri = mesh.coords, mesh.tri
+
+        try:
+            t = locate(mesh, self._last, x, y)
+        except ValueError:
+            # Only a released region can block the walk, search the remaining triangles instead
+            t = self.__scan(x, y)
+
+        # A point already in the mesh can only be located in one of its own triangles
+        for v in tri[3 * t:3 * t + 3]:
+            if coords[2 * v] == x and coords[2 * v + 1] == y:
+                return v
+
+        p = mesh.add_vertex(x, y)
+        self._around.append(-1)
+        self.__place(p, t, x, y)
+        self._size += 1
+        return p
+
+    def __scan(self, x: float, y: float):
+        coords, tri = self.mesh.coords, self.mesh.tri
+
+        for t in range(len(tri) // 3):
+            if tri[3 * t] < 0:
+                continue
+
+            a, b, c = 2 * tri[3 * t], 2 * tri[3 * t + 1], 2 * tri[3 * t + 2]
+            if (orient2d(coords[a], coords[a + 1], coords[b], coords[b + 1], x, y) >= 0 and
+                orient2d(coords[b], coords[b + 1], coords[c], coords[c + 1], x, y) >= 0 and
+                orient2d(coords[c], coords[c + 1], coords[a], coords[a + 1], x, y) >= 0):
+                return t
+
+        raise ValueError(f"Point ({x}, {y}) lies in a released part of the triangulation")
+
+    def __nearest(self, x: float, y: float, start: int):
+        # Closest vertex to (x, y) and the triangle that contains it, for the next walk to start from
+        mesh = self.mesh
+        coords, tri = mesh.coords, mesh.tri
+
+        try:
+            t = locate(mesh, start, x, y)
+        except ValueError:
+            t = start
+
+        def dist(v):
+            return (coords[2 * v] - x) ** 2 + (coords[2 * v + 1] - y) ** 2
+
+        best = min((v for v in tri[3 * t:3 * t + 3] if v >= SUPER_VERTICES), key=dist)
+        best_dist = dist(best)
+
+        # Greedy descent over the Delaunay graph, which has no local minima other than the nearest vertex
+        moved = True
+        while moved:
+            moved = False
+            for w in self.__neighbours(best):
+                if w >= SUPER_VERTICES and dist(w) < best_dist:
+                    best, best_dist, moved = w, dist(w), True
+
+        return best, t
+
+    def __place(self, p: int, start: int, x: float, y: float):
+        mesh = self.mesh
+        tri, nbr = mesh.tri, mesh.nbr
+        around = self._around
+
+        bad, boundary = cavity(mesh, start, x, y)
+
+        # Fan the cavity's boundary edges (a, b) around p as triangles (a, b, p)
+        fan = []
+        by_first, by_second = {}, {}
+        for t, k in boundary:
+            a = tri[3 * t + NEXT[k]]
+            b = tri[3 * t + PREV[k]]
+            outside = nbr[3 * t + k]
+
+            new = mesh.add_triangle(a, b, p)
+            nbr[3 * new + 2] = outside
+            if outside >= 0:
+                mesh.link(outside, t, new)
+
+            fan.append((new, a, b))
+            by_first[a] = new
+            by_second[b] = new
+            around[a] = around[b] = new
+
+        # The boundary is a closed loop, so the fan neighbour across (b, p) starts at b and the one across (p, a) ends at a
+        for new, a, b in fan:
+            nbr[3 * new] = by_first[b]
+            nbr[3 * new + 1] = by_second[a]
+
+        # Bad slots are only recycled once the fan no longer reads them
+        for t in bad:
+            mesh.remove_triangle(t)
+
+        around[p] = new
+        self._last = new
+
+    def __star(self, v: int):
+        # Triangles around v in counterclockwise order, with the position of v in each
+        tri, nbr = self.mesh.tri, self.mesh.nbr
+        first = t = self._around[v]
+
+        while True:
+            s = 3 * t
+            k = 0 if tri[s] == v else 1 if tri[s + 1] == v else 2
+            yield t, k
+
+            # (v, a, b) continues across (v, b), the edge opposite a
+            t = nbr[s + NEXT[k]]
+            if t == first:
+                return
+
+    def __neighbours(self, v: int):
+        tri = self.mesh.tri
+        for t, k in self.__star(v):
+            yield tri[3 * t + NEXT[k]]
+
+    def __remove_vertex(self, v: int):
+        mesh = self.mesh
+        tri, nbr = mesh.tri, mesh.nbr
+        around = self._around
+
+        # The link of v as a counterclockwise polygon, edge i runs from verts[i] to verts[i + 1]
+        # and faces outs[i], whose neighbour slot back into the star is slots[i]
+        star, verts, outs, slots = [], [], [], []
+        for t, k in self.__star(v):
+            out = nbr[3 * t + k]
+            star.append(t)
+            verts.append(tri[3 * t + NEXT[k]])
+            outs.append(out)
+            slots.append(-1 if out < 0 else next(s for s in range(3 * out, 3 * out + 3) if nbr[s] == t))
+
+        for t in star:
+            mesh.remove_triangle(t)
+
+        around[v] = -1
+        insort(self._holes, v)
+        self._size -= 1
+
+        # Clip Delaunay ears off the star shaped hole until a single triangle is left
+        while len(verts) > 3:
+            n = len(verts)
+            i = self.__ear(verts)
+            prev, after = (i - 1) % n, (i + 1) % n
+
+            a, b, c = verts[prev], verts[i], verts[after]
+            new = mesh.add_triangle(a, b, c)
+            around[a] = around[b] = around[c] = new
+
+            self.__connect(3 * new + 2, outs[prev], slots[prev])
+            self.__connect(3 * new, outs[i], slots[i])
+
+            # The ear's third edge becomes the hole's edge from verts[prev] to verts[after]
+            outs[prev], slots[prev] = new, 3 * new + 1
+            del verts[i], outs[i], slots[i]
+
+        new = mesh.add_triangle(*verts)
+        self.__connect(3 * new + 2, outs[0], slots[0])
+        self.__connect(3 * new, outs[1], slots[1])
+        self.__connect(3 * new + 1, outs[2], slots[2])
+
+        for u in verts:
+            around[u] = new
+        self._last = new
+
+    def __ear(self, verts: list):
+        # A convex corner whose circumcircle holds none of the hole's other vertices
+        coords = self.mesh.coords
+        n = len(verts)
+
+        for i in range(n):
+            a, b, c = verts[i - 1], verts[i], verts[(i + 1) % n]
+            corner = (coords[2 * a], coords[2 * a + 1], coords[2 * b], coords[2 * b + 1], coords[2 * c], coords[2 * c + 1])
+
+            if orient2d(*corner) <= 0:
+                continue
+
+            if not any(incircle(*corner, coords[2 * w], coords[2 * w + 1]) > 0 for w in verts if w != a and w != b and w != c):
+                return i
+
+        raise RuntimeError("Star polygon has no Delaunay ear")
+
+    def __connect(self, slot: int, out: int, back: int):
+        self.mesh.nbr[slot] = out
+        if back >= 0:
+            self.mesh.nbr[back] = slot // 3
\ No newline at end of file
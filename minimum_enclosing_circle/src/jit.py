@@ -0,0 +1,16 @@
+from numba import njit
+
+
+@njit(cache=True)
+def farthest(xs, ys, cx, cy):
+    # Index and squared distance of the point farthest from (cx, cy), in one pass without temporaries
+    best, best_d2 = 0, -1.0
+
+    for i in range(len(xs)):
+        dx = xs[i] - cx
+        dy = ys[i] - cy
+        d2 = dx * dx + dy * dy
+        if d2 > best_d2:
+            best, best_d2 = i, d2
+
+    return best, best_d2
\ No newline at end of file
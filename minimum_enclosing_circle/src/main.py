@@ -2,10 +2,15 @@ import sys
 import math
 import time
 import random
+import argparse
+import numpy as np
 import matplotlib.pyplot as plt
 
 from itertools import combinations
 
+# Relative tolerance on squared radii, so the points a circle was built from never count as outside it
+SLACK = 1 + 1e-12
+
 
 def profiler(func):
     def wrapper(*args, **kwargs):
@@ -136,44 +141,185 @@ def min_circle_heuristic(points: list[Point]):
     return circle
 
 
+def circle_two_points(xs: list, ys: list, a: int, b: int):
+    # Centre and squared radius
+    cx, cy = (xs[a] + xs[b]) / 2.0, (ys[a] + ys[b]) / 2.0
+    dx, dy = xs[a] - cx, ys[a] - cy
+    return cx, cy, dx * dx + dy * dy
+
+
+def circle_three_points(xs: list, ys: list, a: int, b: int, c: int):
+    # Relative to a, which keeps the precision of far away coordinates
+    ax, ay = xs[a], ys[a]
+    bx, by = xs[b] - ax, ys[b] - ay
+    cx, cy = xs[c] - ax, ys[c] - ay
+
+    det = 2 * (bx * cy - by * cx)
+
+    if det == 0:
+        raise ValueError("Determinant is invalid.")
+
+    b_sq = bx**2 + by**2
+    c_sq = cx**2 + cy**2
+
+    ux = (cy * b_sq - by * c_sq) / det
+    uy = (bx * c_sq - cx * b_sq) / det
+
+    return ax + ux, ay + uy, ux * ux + uy * uy
+
+
+def move_to_front(order: list, i: int):
+    # Points that broke a circle tend to break the next ones too, so they get tested first
+    order.insert(0, order.pop(i))
+
+
 @profiler
 def min_circle_randomized(points: list[Point]):
-    random.shuffle(points)
-    circle = Circle.two_points(points[0], points[1])
+    # Welzl's algorithm over index ranges of flat coordinate lists, comparing squared distances. The points are
+    # shuffled through an index order, so the input list is left as is
+    xs = [p.x for p in points]
+    ys = [p.y for p in points]
 
-    for i in range(2, len(points)):
-        if(not circle.inside(points[i])):
-            circle = min_circle_with_point(points[:i], points[i])
+    order = list(range(len(points)))
+    random.shuffle(order)
 
-    return circle
+    cx, cy, r2 = circle_two_points(xs, ys, order[0], order[1])
+    bound = r2 * SLACK
 
+    for i in range(2, len(order)):
+        p = order[i]
+        dx, dy = xs[p] - cx, ys[p] - cy
 
-def min_circle_with_point(points:list, q:Point):
-    circle = Circle.two_points(points[0], q)
+        if(dx * dx + dy * dy > bound):
+            cx, cy, r2 = min_circle_with_point(xs, ys, order, i)
+            bound = r2 * SLACK
+            move_to_front(order, i)
 
-    for i in range(1, len(points)):
-        if(not circle.inside(points[i])):
-            circle = min_circle_with_2_points(points[:i], points[i], q)
+    return Circle(Point(cx, cy), math.sqrt(r2))
 
-    return circle
 
+def min_circle_with_point(xs: list, ys: list, order: list, end: int):
+    # Smallest circle around order[:end + 1] with order[end] on its boundary
+    q = order[end]
+    cx, cy, r2 = circle_two_points(xs, ys, order[0], q)
+    bound = r2 * SLACK
 
-def min_circle_with_2_points(points:list, q1:Point, q2:Point):
-    circle = Circle.two_points(q1, q2)
+    for i in range(1, end):
+        p = order[i]
+        dx, dy = xs[p] - cx, ys[p] - cy
 
-    for i in range(0, len(points)):
-        if(not circle.inside(points[i])):
-            circle = Circle.three_points(points[i], q1, q2)
+        if(dx * dx + dy * dy > bound):
+            cx, cy, r2 = min_circle_with_2_points(xs, ys, order, i, q)
+            bound = r2 * SLACK
+            move_to_front(order, i)
+
+    return cx, cy, r2
+
+
+def min_circle_with_2_points(xs: list, ys: list, order: list, end: int, q1: int):
+    # Smallest circle around order[:end + 1] and q1 with both order[end] and q1 on its boundary
+    q2 = order[end]
+    cx, cy, r2 = circle_two_points(xs, ys, q1, q2)
+    bound = r2 * SLACK
+
+    for i in range(end):
+        p = order[i]
+        dx, dy = xs[p] - cx, ys[p] - cy
+
+        if(dx * dx + dy * dy > bound):
+            cx, cy, r2 = circle_three_points(xs, ys, p, q1, q2)
+            bound = r2 * SLACK
+
+    return cx, cy, r2
+
+
+def farthest_numpy(xs: np.ndarray, ys: np.ndarray, cx: float, cy: float):
+    # Index and squared distance of the point farthest from (cx, cy)
+    d2 = (xs - cx)**2 + (ys - cy)**2
+    i = int(np.argmax(d2))
+    return i, float(d2[i])
 
-    return circle
+
+def support_circle(xs: np.ndarray, ys: np.ndarray, ids: list):
+    # Smallest circle through two or three of at most four points that holds all of them, with the points it passes through
+    best = None
+
+    for support in [*combinations(ids, 2), *combinations(ids, 3)]:
+        try:
+            cx, cy, r2 = circle_two_points(xs, ys, *support) if len(support) == 2 else circle_three_points(xs, ys, *support)
+        except ValueError:
+            continue
+
+        if best is not None and r2 >= best[2]:
+            continue
+        if all((xs[i] - cx)**2 + (ys[i] - cy)**2 <= r2 * SLACK for i in ids):
+            best = (cx, cy, r2, list(support))
+
+    return best
+
+
+@profiler
+def min_circle_batch(points: list[Point], kernel: str="numpy"):
+    # Keeps only the circle's support points, and each time the circle changes looks for the farthest point of the
+    # whole set in one pass. The farthest violator joins the support, so the radius strictly grows and few passes are needed
+    match(kernel):
+        case "numpy":
+            farthest = farthest_numpy
+        case "numba":
+            # Imported lazily so the other engines don't pay for loading numba
+            from jit import farthest
+        case _:
+            raise ValueError(f"Invalid kernel: {kernel}")
+
+    xs = np.array([p.x for p in points], dtype=np.float64)
+    ys = np.array([p.y for p in points], dtype=np.float64)
+
+    support = [0]
+    cx, cy, r2 = float(xs[0]), float(ys[0]), 0.0
+
+    while True:
+        i, d2 = farthest(xs, ys, cx, cy)
+        if d2 <= r2 * SLACK:
+            break
+
+        circle = support_circle(xs, ys, support + [int(i)])
+
+        # Rounding can only stall the growth at the very end, where the circle is already the answer
+        if circle is None or circle[2] <= r2:
+            break
+        cx, cy, r2, support = float(circle[0]), float(circle[1]), float(circle[2]), circle[3]
+
+    return Circle(Point(cx, cy), math.sqrt(r2))
+
+
+class HelpOnErrorParser(argparse.ArgumentParser):
+    def error(self, _):
+        self.print_help()
+        sys.exit(2)
+
+
+def parse_args():
+    parser = HelpOnErrorParser(description="Minimum Enclosing Circle Parameters")
+
+    parser.add_argument("n", type=int, nargs="?", default=1, help="Number of random points (default: 1)")
+    parser.add_argument("--engine", choices=["randomized", "batch", "numba"], default="randomized", help="Exact circle drawn beside the heuristic: Welzl's randomized algorithm, or farthest violators found in one NumPy or numba pass per circle (default: randomized)")
+
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
-    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1
-    
-    points = generate_points(n)
+    args = parse_args()
+
+    points = generate_points(args.n)
     circle_heuristic = min_circle_heuristic(points)
-    circle_randomized = min_circle_randomized(points)
+
+    match(args.engine):
+        case "randomized":
+            circle_exact = min_circle_randomized(points)
+        case "batch":
+            circle_exact = min_circle_batch(points)
+        case "numba":
+            circle_exact = min_circle_batch(points, "numba")
     
     x_vals = [p.x for p in points]
     y_vals = [p.y for p in points]
@@ -184,7 +330,7 @@ if __name__ == '__main__':
     circles = [
         (0, 0, 1, 'black', 'Unit Circle', 1.0),
         (circle_heuristic.c.x, circle_heuristic.c.y, circle_heuristic.r, 'red', f'Heuristic (r={circle_heuristic.r:.3f})', 0.5),
-        (circle_randomized.c.x, circle_randomized.c.y, circle_randomized.r, 'green', f'Randomized (r={circle_randomized.r:.3f})', 0.5)
+        (circle_exact.c.x, circle_exact.c.y, circle_exact.r, 'green', f'{args.engine.capitalize()} (r={circle_exact.r:.3f})', 0.5)
     ]
 
     for x, y, r, color, label, alpha in circles:
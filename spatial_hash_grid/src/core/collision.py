@@ -1,97 +1,483 @@
 import math
+import numpy as np
 
-from itertools import combinations
+from itertools import chain
 from collections import defaultdict
 from abc import ABC, abstractmethod
 
-from .colors import WHITE, RED
-from .particles import Particle
+from .colors import WHITE_ID, RED_ID
+from .particles import ParticleStore
+from .contacts import ContactBuffer
+from .timing import PhaseTimer
 
 class CollisionStrategy(ABC):
+    def __init__(self):
+        # Accumulated seconds per phase (grid, broad, narrow)
+        self.timer = PhaseTimer()
+
+        # Reused every frame, execute() returns it filled with the frame's contacts
+        self.contacts = ContactBuffer()
+
+    @abstractmethod
+    def execute(self, particles: ParticleStore):
+        pass
+
+
+class BroadPhaseStrategy(CollisionStrategy):
+    def execute(self, particles: ParticleStore):
+        particles.color.fill(WHITE_ID)
+
+        with self.timer.phase("grid"):
+            self.build(particles)
+
+        with self.timer.phase("broad"):
+            pairs = self.broad_phase(particles)
+
+        with self.timer.phase("narrow"):
+            return narrow_phase(particles, pairs, self.contacts)
+
+    # Updates the acceleration structure, reported as the grid phase
+    @abstractmethod
+    def build(self, particles: ParticleStore):
+        pass
+
+    # Returns every candidate pair exactly once as an (m, 2) index array
     @abstractmethod
-    def execute(self):
+    def broad_phase(self, particles: ParticleStore):
         pass
 
 
 class NaiveStrategy(CollisionStrategy):
+    # Elements per temporary matrix, a block tests as many rows as fit against all n particles
+    BLOCK_ELEMENTS = 1 << 22
+
     def __init__(self):
         super().__init__()
 
-    def execute(self, particles: list[Particle]):
+    def execute(self, particles: ParticleStore):
+        x, y, r = particles.x, particles.y, particles.r
+        n = len(particles)
+
         # Reset color
-        for p in particles:
-            p.color = WHITE
+        particles.color.fill(WHITE_ID)
+
+        # Seeded with empty arrays so an empty store still concatenates
+        first, second = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+
+        # Check each block of particles against itself and every particle after it
+        with self.timer.phase("narrow"):
+            block = max(1, self.BLOCK_ELEMENTS // max(n, 1))
+            for start in range(0, n, block):
+                end = min(start + block, n)
 
-        # Check for collisions against every other particle
-        for p1, p2 in combinations(particles, 2):
-            dx = p1.x - p2.x
-            dy = p1.y - p2.y
-            dist = math.hypot(dx, dy)
+                dx = x[start:end, None] - x[None, start:]
+                dy = y[start:end, None] - y[None, start:]
+                reach = r[start:end, None] + r[None, start:]
 
-            if dist < p1.r + p2.r:
-                p1.color = RED
-                p2.color = RED
+                touching = np.triu(dx * dx + dy * dy < reach * reach, k=1)
+                rows, cols = np.nonzero(touching)
+
+                first.append(rows + start)
+                second.append(cols + start)
+
+            # Only touching pairs are left, the shared narrow phase turns them into contacts
+            pairs = np.stack((np.concatenate(first), np.concatenate(second)), axis=1)
+            return narrow_phase(particles, pairs, self.contacts)
 
 
 class SpatialHashGrid:
     def __init__(self, cell_size):
-        self._cell_size = cell_size
+        self.cell_size = cell_size
         self._cells = defaultdict(list)
     
-    def add(self, particle: Particle):
-        r = particle.r
-
-        min_x, min_y = self.__hash(particle.x - r, particle.y - r)
-        max_x, max_y = self.__hash(particle.x + r, particle.y + r)
+    def add(self, index: int, x: float, y: float, r: float):
+        min_x, min_y = self.cell_of(x - r, y - r)
+        max_x, max_y = self.cell_of(x + r, y + r)
 
         for cx in range(min_x, max_x + 1):
             for cy in range(min_y, max_y + 1):
-                self._cells[(cx, cy)].append(particle)
+                self._cells[(cx, cy)].append(index)
 
     def all_cell_groups(self):
         return self._cells.values()
 
+    def all_cells(self):
+        return self._cells.items()
+
     def clear(self):
         self._cells.clear()
 
-    def __hash(self, x: float, y: float):
-        return int(x // self._cell_size), int(y // self._cell_size)
+    def cell_of(self, x: float, y: float):
+        return int(x // self.cell_size), int(y // self.cell_size)
 
 
-class SGHStrategy(CollisionStrategy):
+class SGHStrategy(BroadPhaseStrategy):
     def __init__(self, radius: float):
         super().__init__()
 
         # Use particle's radius as heuristic
         self._grid = SpatialHashGrid(2 * radius)
 
-    def execute(self, particles: list[Particle]):
+    def build(self, particles: ParticleStore):
         self._grid.clear()
 
-        for p in particles:
-            p.color = WHITE
-            self._grid.add(p)
+        # Plain floats are much cheaper to index one at a time than array elements
+        xs, ys, rs = particles.x.tolist(), particles.y.tolist(), particles.r.tolist()
+
+        for i, (x, y, r) in enumerate(zip(xs, ys, rs)):
+            self._grid.add(i, x, y, r)
+
+    def broad_phase(self, particles: ParticleStore):
+        # Flatten the cells into one member array, cell k owning members[start[k]:end[k]]
+        cells = list(self._grid.all_cells())
+        counts = np.fromiter((len(members) for _, members in cells), dtype=np.int64, count=len(cells))
+        members = np.fromiter(chain.from_iterable(members for _, members in cells), dtype=np.int64, count=int(counts.sum()))
+        cell_x, cell_y = np.array([cell for cell, _ in cells], dtype=np.int64).reshape(-1, 2).T
+
+        # Within a cell, each member pairs with the ones stored after it
+        slot = np.arange(len(members))
+        owner_cell = np.repeat(np.arange(len(cells)), counts)
+        end = np.repeat(np.cumsum(counts), counts)
+
+        owners, slots = expand_ranges(slot + 1, end - slot - 1)
+        i, j = members[owners], members[slots]
+        cell = owner_cell[owners]
+
+        # Overlapping boxes share up to four cells, only the one holding the corner of their intersection reports the pair
+        size = self._grid.cell_size
+        corner_x = np.floor_divide(particles.x - particles.r, size).astype(np.int64)
+        corner_y = np.floor_divide(particles.y - particles.r, size).astype(np.int64)
+
+        keep = (np.maximum(corner_x[i], corner_x[j]) == cell_x[cell]) & (np.maximum(corner_y[i], corner_y[j]) == cell_y[cell])
+        return np.stack((i[keep], j[keep]), axis=1)
+
+
+class CountingSortGrid:
+    def __init__(self, cell_size: float, width: int, height: int, reach: int=1):
+        self._width = width
+        self._height = height
+        self.n = 0
+        self.resize(cell_size, reach)
+
+    @staticmethod
+    def half_neighbourhood(reach: int):
+        # Neighbouring cells visited from each home cell, the mirrored half is covered by the neighbours themselves
+        return [(ox, 0) for ox in range(1, reach + 1)] + [(ox, oy) for oy in range(1, reach + 1) for ox in range(-reach, reach + 1)]
+
+    def resize(self, cell_size: float, reach: int=1):
+        # Cells within `reach` of a home cell must cover the largest colliding distance
+        self.cell_size = cell_size
+        self.reach = reach
+        self._offsets = self.half_neighbourhood(reach)
+        self.cols = max(1, math.ceil(self._width / cell_size))
+        self.rows = max(1, math.ceil(self._height / cell_size))
+
+        n_cells = self.cols * self.rows
+        self.cell_count = np.zeros(n_cells, dtype=np.int64)
+        self.cell_start = np.zeros(n_cells + 1, dtype=np.int64)
+
+        # With 16-bit keys NumPy's stable sort is a radix (counting) sort
+        self._key_dtype = np.uint16 if n_cells <= np.iinfo(np.uint16).max else np.int64
+        self.__allocate(0)
+
+    def build(self, x: np.ndarray, y: np.ndarray):
+        n = len(x)
+        if n > self._capacity:
+            self.__allocate(n)
+
+        self.n = n
+        self.cell_x = self._cell_x[:n]
+        self.cell_y = self._cell_y[:n]
+        self.keys = self._keys[:n]
+
+        self.__cell_coords(x, self.cols, self.cell_x)
+        self.__cell_coords(y, self.rows, self.cell_y)
+
+        np.multiply(self.cell_y, self.cols, out=self._scratch_key[:n])
+        np.add(self._scratch_key[:n], self.cell_x, out=self._scratch_key[:n])
+        np.copyto(self.keys, self._scratch_key[:n], casting="unsafe")
+
+        # Counting sort: per-cell histogram, prefix sums, then indices ordered by cell
+        self.cell_count[:] = np.bincount(self.keys, minlength=len(self.cell_count))
+        np.cumsum(self.cell_count, out=self.cell_start[1:])
+        self.order = np.argsort(self.keys, kind="stable")
+
+    def __cell_coords(self, pos: np.ndarray, limit: int, out: np.ndarray):
+        scratch = self._scratch_pos[:len(pos)]
+
+        np.divide(pos, self.cell_size, out=scratch)
+        np.clip(scratch, 0, limit - 1, out=scratch)
+        np.copyto(out, scratch, casting="unsafe")
+
+    def __allocate(self, n: int):
+        self._capacity = n
+        self._cell_x = np.empty(n, dtype=np.int64)
+        self._cell_y = np.empty(n, dtype=np.int64)
+        self._scratch_key = np.empty(n, dtype=np.int64)
+        self._scratch_pos = np.empty(n, dtype=np.float64)
+        self._keys = np.empty(n, dtype=self._key_dtype)
+
+    def cells_of(self, x: np.ndarray, y: np.ndarray):
+        cx = np.clip(x // self.cell_size, 0, self.cols - 1).astype(np.int64)
+        cy = np.clip(y // self.cell_size, 0, self.rows - 1).astype(np.int64)
+        return cx, cy
+
+    def cell_slots(self, cx: np.ndarray, cy: np.ndarray):
+        # Pairs (query, slot in order) for every particle stored in each queried cell
+        valid = np.flatnonzero((cx >= 0) & (cx < self.cols) & (cy >= 0) & (cy < self.rows))
+        cell = cy[valid] * self.cols + cx[valid]
+
+        owners, slots = expand_ranges(self.cell_start[cell], self.cell_count[cell])
+        return valid[owners], slots
+
+    def neighbour_slots(self, ox: int, oy: int):
+        return self.cell_slots(self.cell_x + ox, self.cell_y + oy)
+
+    def crowding(self):
+        # Average number of particles sharing a cell with a particle, itself included
+        return float(np.dot(self.cell_count, self.cell_count)) / self.n if self.n else 0.0
+
+    def candidate_pairs(self):
+        # Within a cell, each particle pairs with the ones sorted after it
+        slot = np.arange(self.n)
+        end = self.cell_start[1:][self.keys[self.order]]
+
+        owners, slots = expand_ranges(slot + 1, end - slot - 1)
+        first = [self.order[owners]]
+        second = [self.order[slots]]
+
+        for ox, oy in self._offsets:
+            i, slots = self.neighbour_slots(ox, oy)
+            first.append(i)
+            second.append(self.order[slots])
+
+        return np.stack((np.concatenate(first), np.concatenate(second)), axis=1)
+
+
+def expand_ranges(starts: np.ndarray, counts: np.ndarray):
+    # Flattens the ranges [starts[k], starts[k] + counts[k]) and tags each element with k
+    total = int(counts.sum())
+    owners = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owners, np.repeat(starts, counts) + offsets
+
+
+class CellSizePolicy:
+    # Frames between re-tunes and the relative change needed to rebuild the grid
+    INTERVAL = 30
+    TOLERANCE = 0.1
+
+    # Cost of visiting a cell relative to testing one candidate pair
+    CELL_COST = 4.0
+    MAX_REACH = 4
 
-        for cell_particles in self._grid.all_cell_groups():
-            if len(cell_particles) < 2:
+    def __init__(self, width: int, height: int):
+        self._area = width * height
+        self._frame = 0
+
+    def update(self, particles: ParticleStore, grid: CountingSortGrid):
+        self._frame += 1
+
+        # Always re-tune immediately if particles outgrew the grid's reach
+        r_max = float(particles.r.max()) if len(particles) else 0.0
+        fits = 2 * r_max <= grid.cell_size * grid.reach
+
+        if fits and self._frame < self.INTERVAL:
+            return
+        self._frame = 0
+
+        cell_size, reach = self.choose(particles, grid)
+        if fits and abs(cell_size - grid.cell_size) <= self.TOLERANCE * grid.cell_size:
+            return
+
+        grid.resize(cell_size, reach)
+
+    def choose(self, particles: ParticleStore, grid: CountingSortGrid):
+        n = len(particles)
+        diameter = 2 * float(particles.r.max()) if n else grid.cell_size
+
+        # Particles per unit area around an average particle, clustering raises it above n / area
+        density = n / self._area
+        if grid.n == n and n:
+            density = max(density, grid.crowding() / grid.cell_size**2)
+
+        # Smaller cells test fewer candidates but visit more of them: (2k + 1)^2 / 2 cells of size diameter / k
+        def cost(reach):
+            cell_size = diameter / reach
+            return (2 * reach + 1)**2 / 2 * (self.CELL_COST + density * cell_size**2)
+
+        reach = min(range(1, self.MAX_REACH + 1), key=cost)
+        return diameter / reach, reach
+
+
+class SortedSGHStrategy(BroadPhaseStrategy):
+    def __init__(self, radius: float, width: int, height: int, adaptive: bool=False):
+        super().__init__()
+
+        # Each particle lives in a single home cell, so cells must fit a whole particle pair
+        self._grid = CountingSortGrid(2 * radius, width, height)
+        self._policy = CellSizePolicy(width, height) if adaptive else None
+
+    def build(self, particles: ParticleStore):
+        if self._policy is not None:
+            self._policy.update(particles, self._grid)
+
+        self._grid.build(particles.x, particles.y)
+
+    def broad_phase(self, particles: ParticleStore):
+        return self._grid.candidate_pairs()
+
+
+class HierarchicalSGHStrategy(BroadPhaseStrategy):
+    # Neighbourhood searched in a coarser level, which always fits the pair
+    NEIGHBOURHOOD = [(ox, oy) for oy in (-1, 0, 1) for ox in (-1, 0, 1)]
+
+    def __init__(self, width: int, height: int):
+        super().__init__()
+
+        self._width = width
+        self._height = height
+        self._base = None
+        self._levels = []
+
+    def build(self, particles: ParticleStore):
+        r = particles.r
+        r_min = max(float(r.min()), 1e-6) if len(particles) else 1.0
+
+        # Level l has cells of 2 * r_min * 2^l, each particle goes to the finest level fitting its diameter
+        if 2 * r_min != self._base:
+            self._base = 2 * r_min
+            self._levels = []
+
+        level = np.ceil(np.log2(np.maximum(2 * r / self._base, 1.0))).astype(np.int64)
+        depth = int(level.max()) + 1 if len(particles) else 0
+
+        while len(self._levels) < depth:
+            self._levels.append(CountingSortGrid(self._base * 2**len(self._levels), self._width, self._height))
+
+        self._members = []
+        for l in range(depth):
+            members = np.flatnonzero(level == l)
+            self._levels[l].build(particles.x[members], particles.y[members])
+            self._members.append(members)
+
+    def broad_phase(self, particles: ParticleStore):
+        first, second = [], []
+
+        for l, members in enumerate(self._members):
+            if not len(members):
                 continue
 
-            # Check for collisions against every other particle within the same cell
-            for p1, p2 in combinations(cell_particles, 2):
-                dx = p1.x - p2.x
-                dy = p1.y - p2.y
-                dist = math.hypot(dx, dy)
+            # Pairs within the level
+            local = self._levels[l].candidate_pairs()
+            first.append(members[local[:, 0]])
+            second.append(members[local[:, 1]])
+
+            # Pairs with particles of every coarser level
+            for coarse in range(l + 1, len(self._members)):
+                if not len(self._members[coarse]):
+                    continue
+
+                grid = self._levels[coarse]
+                cx, cy = grid.cells_of(particles.x[members], particles.y[members])
+
+                for ox, oy in self.NEIGHBOURHOOD:
+                    owners, slots = grid.cell_slots(cx + ox, cy + oy)
+                    first.append(members[owners])
+                    second.append(self._members[coarse][grid.order[slots]])
+
+        if not first:
+            return np.empty((0, 2), dtype=np.int64)
+
+        return np.stack((np.concatenate(first), np.concatenate(second)), axis=1)
+
+
+class SweepAndPruneStrategy(BroadPhaseStrategy):
+    def __init__(self):
+        super().__init__()
+
+        self._order = None
+
+    def build(self, particles: ParticleStore):
+        n = len(particles)
+
+        if self._order is None or len(self._order) != n:
+            # Sweep along the axis the particles are most spread over
+            self._axis = 0 if n == 0 or np.var(particles.x) >= np.var(particles.y) else 1
+            self._order = np.arange(n)
+
+        pos = particles.x if self._axis == 0 else particles.y
+        lo = pos - particles.r
+
+        # Last frame's order is nearly sorted, which NumPy's stable sort (timsort) finishes in close to linear time
+        self._order = self._order[np.argsort(lo[self._order], kind="stable")]
+
+        self._lo = lo[self._order]
+        self._hi = (pos + particles.r)[self._order]
+
+    def broad_phase(self, particles: ParticleStore):
+        # Each interval overlaps the ones sorted after it that start before it ends
+        slot = np.arange(len(self._order))
+        end = np.searchsorted(self._lo, self._hi, side="left")
+
+        owners, slots = expand_ranges(slot + 1, np.maximum(end - slot - 1, 0))
+        i, j = self._order[owners], self._order[slots]
+
+        # Prune along the other axis as well
+        other = particles.y if self._axis == 0 else particles.x
+        keep = np.abs(other[i] - other[j]) < particles.r[i] + particles.r[j]
+
+        return np.stack((i[keep], j[keep]), axis=1)
+
+
+def narrow_phase(particles: ParticleStore, pairs: np.ndarray, contacts: ContactBuffer):
+    i, j = pairs[:, 0], pairs[:, 1]
+
+    dx = particles.x[j] - particles.x[i]
+    dy = particles.y[j] - particles.y[i]
+    reach = particles.r[i] + particles.r[j]
+
+    dist_sq = dx * dx + dy * dy
+    hits = dist_sq < reach * reach
+
+    i, j = i[hits], j[hits]
+    dx, dy, reach = dx[hits], dy[hits], reach[hits]
+    dist = np.sqrt(dist_sq[hits])
+
+    particles.color[i] = RED_ID
+    particles.color[j] = RED_ID
+
+    contacts.resize(len(i))
+    contacts.i[:] = i
+    contacts.j[:] = j
+    np.subtract(reach, dist, out=contacts.penetration)
+
+    # Coincident centres get an arbitrary but valid normal
+    apart = dist > 0
+    contacts.normal[:] = (1.0, 0.0)
+    np.divide(dx, dist, out=contacts.normal[:, 0], where=apart)
+    np.divide(dy, dist, out=contacts.normal[:, 1], where=apart)
 
-                if dist < p1.r + p2.r:
-                    p1.color = RED
-                    p2.color = RED
+    return contacts
 
 
-def create_collision_strategy(strategy: str, radius: int):
+def create_collision_strategy(strategy: str, radius: int, width: int, height: int):
     match(strategy):
         case "naive":
             return NaiveStrategy()
         case "shg":
             return SGHStrategy(radius)
+        case "shg-sort":
+            return SortedSGHStrategy(radius, width, height)
+        case "shg-adaptive":
+            return SortedSGHStrategy(radius, width, height, adaptive=True)
+        case "shg-multi":
+            return HierarchicalSGHStrategy(width, height)
+        case "sap":
+            return SweepAndPruneStrategy()
+        case "shg-jit" | "shg-jit-parallel":
+            # Imported lazily so the other strategies don't pay for loading numba
+            from .jit import JITSGHStrategy
+            return JITSGHStrategy(radius, width, height, parallel=strategy == "shg-jit-parallel")
         case _:
             raise ValueError(f"Invalid collision strategy: {strategy}")
\ No newline at end of file
@@ -1,3 +1,9 @@
 WHITE = (255, 255, 255)
 BLACK = (000, 000, 000)
 RED   = (255, 000, 000)
+
+# Palette indices stored per particle
+WHITE_ID = 0
+RED_ID   = 1
+
+PALETTE = (WHITE, RED)
\ No newline at end of file
@@ -0,0 +1,89 @@
+import numpy as np
+
+from .particles import ParticleStore
+
+# Growable contact storage reused across frames, valid entries are views of length count
+class ContactBuffer:
+    def __init__(self, capacity: int=0):
+        self.__allocate(capacity)
+        self.resize(0)
+
+    def __len__(self):
+        return self.count
+
+    def resize(self, count: int):
+        if count > self._capacity:
+            self.__allocate(max(count, 2 * self._capacity))
+
+        self.count = count
+        self.i = self._i[:count]
+        self.j = self._j[:count]
+        self.normal = self._normal[:count]
+        self.penetration = self._penetration[:count]
+
+    def pairs(self):
+        return np.stack((self.i, self.j), axis=1)
+
+    def __allocate(self, capacity: int):
+        self._capacity = capacity
+        self._i = np.empty(capacity, dtype=np.int64)
+        self._j = np.empty(capacity, dtype=np.int64)
+
+        # Unit vector pointing from particle i to particle j
+        self._normal = np.empty((capacity, 2), dtype=np.float64)
+        self._penetration = np.empty(capacity, dtype=np.float64)
+
+
+def resolve_elastic(particles: ParticleStore, contacts: ContactBuffer, restitution: float=1.0):
+    if not len(contacts):
+        return
+
+    # Imported lazily so the collision strategies don't pay for loading numba
+    from .jit import sequential_impulses
+
+    n = len(particles)
+    i, j, normal, penetration = canonical_contacts(contacts)
+    nx, ny = np.ascontiguousarray(normal[:, 0]), np.ascontiguousarray(normal[:, 1])
+
+    # Equal density discs, so mass grows with the area
+    inv_mass = 1.0 / (particles.r * particles.r)
+    inv_i, inv_j = inv_mass[i], inv_mass[j]
+    inv_sum = inv_i + inv_j
+
+    vx = particles.v * particles.dx
+    vy = particles.v * particles.dy
+
+    # Sequential impulses in canonical contact order, so every pairwise impulse sees up to date velocities whichever strategy found the contacts
+    sequential_impulses(i, j, nx, ny, inv_mass, vx, vy, restitution)
+
+    # Push overlapping particles apart in proportion to their inverse mass, shared among the busiest particle's contacts
+    degree = np.bincount(i, minlength=n) + np.bincount(j, minlength=n)
+    push = penetration / (np.maximum(degree[i], degree[j]) * inv_sum)
+
+    particles.x += np.bincount(j, push * inv_j * nx, n) - np.bincount(i, push * inv_i * nx, n)
+    particles.y += np.bincount(j, push * inv_j * ny, n) - np.bincount(i, push * inv_i * ny, n)
+
+    # Back to the store's speed and direction representation
+    speed = np.hypot(vx, vy)
+    moving = speed > 0
+
+    particles.v[:] = speed
+    np.divide(vx, speed, out=particles.dx, where=moving)
+    np.divide(vy, speed, out=particles.dy, where=moving)
+
+
+def kinetic_energy(particles: ParticleStore):
+    # In the same units as resolve_elastic's masses, proportional to the area
+    return 0.5 * float(np.sum(particles.r * particles.r * particles.v * particles.v))
+
+
+def canonical_contacts(contacts: ContactBuffer):
+    # Copies with i < j and the contacts sorted by (i, j), so the floating point sums don't depend on which strategy
+    # found the contacts or in what order
+    i, j = contacts.i, contacts.j
+    swap = i > j
+    sign = np.where(swap, -1.0, 1.0)[:, None]
+    i, j = np.where(swap, j, i), np.where(swap, i, j)
+
+    order = np.lexsort((j, i))
+    return i[order], j[order], (contacts.normal * sign)[order], contacts.penetration[order]
\ No newline at end of file
@@ -0,0 +1,169 @@
+import math
+import numpy as np
+
+from numba import njit, prange
+
+from .colors import WHITE_ID, RED_ID
+from .particles import ParticleStore
+from .collision import CollisionStrategy
+
+# Half neighbourhood visited from each home cell, see CountingSortGrid.half_neighbourhood
+OFFSETS_X = np.array([1, -1, 0, 1], dtype=np.int64)
+OFFSETS_Y = np.array([0, 1, 1, 1], dtype=np.int64)
+
+
+@njit(cache=True)
+def build_grid(x, y, cell_size, cols, rows, cell_x, cell_y, cell_start, cursor, order):
+    n = len(x)
+    n_cells = cols * rows
+
+    cell_start[:] = 0
+
+    # Histogram of home cells, shifted by one so the prefix sum yields the starts
+    for i in range(n):
+        cx = min(max(int(x[i] / cell_size), 0), cols - 1)
+        cy = min(max(int(y[i] / cell_size), 0), rows - 1)
+        cell_x[i] = cx
+        cell_y[i] = cy
+        cell_start[cy * cols + cx + 1] += 1
+
+    for k in range(n_cells):
+        cell_start[k + 1] += cell_start[k]
+
+    # Scatter every particle index into its cell's slot range
+    cursor[:] = cell_start[:n_cells]
+    for i in range(n):
+        key = cell_y[i] * cols + cell_x[i]
+        order[cursor[key]] = i
+        cursor[key] += 1
+
+
+def _collide(x, y, r, cols, rows, cell_x, cell_y, cell_start, order, counts, offsets, first_out, second_out, normal_out, penetration_out, write):
+    n = len(order)
+
+    for p in prange(n):
+        i = order[p]
+        cx, cy = cell_x[i], cell_y[i]
+        found = 0
+
+        for k in range(5):
+            # k == 0 is the home cell, where only the particles sorted after i are visited
+            if k == 0:
+                first = p + 1
+                last = cell_start[cy * cols + cx + 1]
+            else:
+                nx = cx + OFFSETS_X[k - 1]
+                ny = cy + OFFSETS_Y[k - 1]
+
+                if nx < 0 or nx >= cols or ny >= rows:
+                    continue
+
+                first = cell_start[ny * cols + nx]
+                last = cell_start[ny * cols + nx + 1]
+
+            for q in range(first, last):
+                j = order[q]
+
+                dx = x[j] - x[i]
+                dy = y[j] - y[i]
+                reach = r[i] + r[j]
+                dist_sq = dx * dx + dy * dy
+
+                if dist_sq < reach * reach:
+                    if write:
+                        slot = offsets[p] + found
+                        dist = math.sqrt(dist_sq)
+
+                        first_out[slot] = i
+                        second_out[slot] = j
+                        penetration_out[slot] = reach - dist
+
+                        # Coincident centres get an arbitrary but valid normal
+                        if dist > 0:
+                            normal_out[slot, 0] = dx / dist
+                            normal_out[slot, 1] = dy / dist
+                        else:
+                            normal_out[slot, 0] = 1.0
+                            normal_out[slot, 1] = 0.0
+                    found += 1
+
+        counts[p] = found
+
+
+collide = njit(cache=True)(_collide)
+collide_parallel = njit(parallel=True, cache=True)(_collide)
+
+
+@njit(cache=True)
+def sequential_impulses(i, j, nx, ny, inv_mass, vx, vy, restitution):
+    # One contact after the other, each impulse sees the velocities the previous ones left behind. A full elastic
+    # impulse between two discs keeps their kinetic energy, so the whole pass does too
+    for k in range(len(i)):
+        a, b = i[k], j[k]
+        closing = (vx[b] - vx[a]) * nx[k] + (vy[b] - vy[a]) * ny[k]
+
+        # Only pairs still moving towards each other
+        if closing < 0:
+            impulse = -(1 + restitution) * closing / (inv_mass[a] + inv_mass[b])
+            vx[a] -= impulse * inv_mass[a] * nx[k]
+            vy[a] -= impulse * inv_mass[a] * ny[k]
+            vx[b] += impulse * inv_mass[b] * nx[k]
+            vy[b] += impulse * inv_mass[b] * ny[k]
+
+
+class JITSGHStrategy(CollisionStrategy):
+    def __init__(self, radius: float, width: int, height: int, parallel: bool=False):
+        super().__init__()
+
+        self._cell_size = 2 * radius
+        self._cols = max(1, math.ceil(width / self._cell_size))
+        self._rows = max(1, math.ceil(height / self._cell_size))
+
+        n_cells = self._cols * self._rows
+        self._cell_start = np.zeros(n_cells + 1, dtype=np.int64)
+        self._cursor = np.zeros(n_cells, dtype=np.int64)
+
+        self._collide = collide_parallel if parallel else collide
+        self.__allocate(0)
+
+    def execute(self, particles: ParticleStore):
+        x, y, r = particles.x, particles.y, particles.r
+        n = len(particles)
+
+        if n > self._capacity:
+            self.__allocate(n)
+
+        particles.color.fill(WHITE_ID)
+
+        order = self._order[:n]
+        counts, offsets = self._counts[:n], self._offsets[:n]
+
+        with self.timer.phase("grid"):
+            build_grid(x, y, self._cell_size, self._cols, self._rows, self._cell_x, self._cell_y, self._cell_start, self._cursor, order)
+
+        # Broad and narrow phase are fused, the candidate pairs never leave the kernel
+        with self.timer.phase("narrow"):
+            # First pass counts hits per particle so the second one can write them without contention
+            args = (x, y, r, self._cols, self._rows, self._cell_x, self._cell_y, self._cell_start, order, counts, offsets)
+            contacts = self.contacts
+            self._collide(*args, contacts.i, contacts.j, contacts.normal, contacts.penetration, False)
+
+            np.cumsum(counts, out=offsets)
+            total = int(offsets[-1]) if n else 0
+            offsets -= counts
+
+            contacts.resize(total)
+            self._collide(*args, contacts.i, contacts.j, contacts.normal, contacts.penetration, True)
+
+            particles.color[contacts.i] = RED_ID
+            particles.color[contacts.j] = RED_ID
+
+        return contacts
+
+    def __allocate(self, n: int):
+        self._capacity = n
+        self._cell_x = np.empty(n, dtype=np.int64)
+        self._cell_y = np.empty(n, dtype=np.int64)
+        self._order = np.empty(n, dtype=np.int64)
+        self._counts = np.empty(n, dtype=np.int64)
+        self._offsets = np.empty(n, dtype=np.int64)
\ No newline at end of file
@@ -0,0 +1,137 @@
+import numpy as np
+
+from itertools import repeat
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+from .colors import WHITE_ID, RED_ID
+from .particles import ParticleStore
+from .contacts import ContactBuffer
+from .collision import create_collision_strategy
+from .timing import PhaseTimer
+
+# Per worker process state, filled once by the pool initializer
+_worker = {}
+
+
+def _attach(layout: dict, max_dist, strategy: str, radius: float, strips: int):
+    blocks, arrays = {}, {}
+
+    for name, (block_name, n, dtype) in layout.items():
+        blocks[name] = shared_memory.SharedMemory(name=block_name)
+        arrays[name] = np.ndarray(n, dtype=dtype, buffer=blocks[name].buf)
+
+    _worker["blocks"] = blocks
+    _worker["store"] = ParticleStore.from_arrays(arrays, max_dist)
+    _worker["slices"] = {}
+    _worker["strategy"] = create_collision_strategy(strategy, radius, *max_dist)
+    _worker["strip_height"] = max_dist[1] / strips
+    _worker["strips"] = strips
+
+    # Pairs closer than two radii can reach at most one cell into a neighbouring strip
+    _worker["ghost"] = 2 * radius
+
+
+def _integrate(start: int, end: int, dt: float):
+    # Integration is independent per particle, so workers take contiguous index ranges of the shared arrays
+    key = (start, end)
+    if key not in _worker["slices"]:
+        store = _worker["store"]
+        arrays = {name: getattr(store, name)[start:end] for name in ParticleStore.FIELDS}
+        _worker["slices"][key] = ParticleStore.from_arrays(arrays, store._max_dist)
+
+    view = _worker["slices"][key]
+    view.update(dt)
+    view.color.fill(WHITE_ID)
+
+
+def _strip_of(y: np.ndarray):
+    return np.clip(y // _worker["strip_height"], 0, _worker["strips"] - 1).astype(np.int64)
+
+
+def _collide(strip: int):
+    store = _worker["store"]
+    ghost = _worker["ghost"]
+
+    # Particles owned by the strip plus the ghost zones above and below it
+    lo = strip * _worker["strip_height"]
+    hi = lo + _worker["strip_height"]
+    members = np.flatnonzero((store.y >= lo - ghost) & (store.y < hi + ghost))
+
+    if not len(members):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty((0, 2)), np.empty(0)
+
+    arrays = {name: getattr(store, name)[members] for name in ParticleStore.FIELDS}
+    local = ParticleStore.from_arrays(arrays, store._max_dist)
+    contacts = _worker["strategy"].execute(local)
+
+    i, j = members[contacts.i], members[contacts.j]
+
+    # Pairs crossing a boundary are found by both strips, the one owning the lower index keeps them
+    keep = _strip_of(store.y[np.minimum(i, j)]) == strip
+    i, j = i[keep], j[keep]
+
+    store.color[i] = RED_ID
+    store.color[j] = RED_ID
+
+    return i, j, contacts.normal[keep].copy(), contacts.penetration[keep].copy()
+
+
+class StripStepper:
+    def __init__(self, particles: ParticleStore, strategy: str, radius: float, max_dist, workers: int):
+        self._workers = workers
+        self._blocks = {}
+        self.contacts = ContactBuffer()
+
+        # Move the particle state into shared memory, the returned store views it
+        layout, arrays = {}, {}
+        n = len(particles)
+
+        for name, dtype in ParticleStore.FIELDS.items():
+            source = getattr(particles, name)
+
+            block = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+            arrays[name] = np.ndarray(n, dtype=dtype, buffer=block.buf)
+            arrays[name][:] = source
+
+            self._blocks[name] = block
+            layout[name] = (block.name, n, dtype)
+
+        self.particles = ParticleStore.from_arrays(arrays, max_dist)
+
+        bounds = np.linspace(0, n, workers + 1).astype(np.int64)
+        self._starts, self._ends = bounds[:-1].tolist(), bounds[1:].tolist()
+
+        self._pool = ProcessPoolExecutor(workers, initializer=_attach, initargs=(layout, max_dist, strategy, radius, workers))
+
+    def step(self, dt: float, timer: PhaseTimer):
+        # Every integration must finish before any strip looks at its neighbours
+        with timer.phase("integrate"):
+            list(self._pool.map(_integrate, self._starts, self._ends, repeat(dt)))
+
+        with timer.phase("collide"):
+            results = list(self._pool.map(_collide, range(self._workers)))
+
+        contacts = self.contacts
+        contacts.resize(sum(len(i) for i, *_ in results))
+
+        offset = 0
+        for i, j, normal, penetration in results:
+            end = offset + len(i)
+            contacts.i[offset:end] = i
+            contacts.j[offset:end] = j
+            contacts.normal[offset:end] = normal
+            contacts.penetration[offset:end] = penetration
+            offset = end
+
+        return contacts
+
+    def close(self):
+        self._pool.shutdown()
+
+        # Drop our own views before releasing the memory behind them
+        self.particles = None
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
\ No newline at end of file
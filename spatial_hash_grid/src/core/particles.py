@@ -1,35 +1,89 @@
-import math
-import random
+import numpy as np
 
 from typing import Tuple
 
-from .colors import WHITE
+from .colors import WHITE_ID
 
-class Particle:
-    def __init__(self, x: float, y: float, r: int, v: int, max_dist: Tuple[int, int]):
-        self.x = x
-        self.y = y
-        self.r = r
-        self.v = v
+# Struct-of-arrays storage: one contiguous array per particle attribute
+class ParticleStore:
+    # Per-particle arrays and their types
+    FIELDS = {
+        "x": np.float64,
+        "y": np.float64,
+        "r": np.float64,
+        "v": np.float64,
+        "dx": np.float64,
+        "dy": np.float64,
+        "color": np.uint8,
+    }
 
-        self.color = WHITE
+    def __init__(self, x, y, r, v, max_dist: Tuple[int, int], rng: np.random.Generator=None):
+        rng = rng if rng is not None else np.random.default_rng()
+
+        self.x = np.array(x, dtype=np.float64)
+        n = len(self.x)
+
+        self.y = np.array(y, dtype=np.float64)
+        self.r = np.broadcast_to(np.asarray(r, dtype=np.float64), n).copy()
+        self.v = np.broadcast_to(np.asarray(v, dtype=np.float64), n).copy()
+
+        self.color = np.full(n, WHITE_ID, dtype=np.uint8)
+
+        angle = rng.uniform(0, 2 * np.pi, n)
+        self.dx = np.cos(angle)
+        self.dy = np.sin(angle)
 
-        angle = random.uniform(0, 2 * math.pi)
-        self._dx = math.cos(angle)
-        self._dy = math.sin(angle)
-        
         self._max_dist = max_dist
+        self.__allocate_scratch()
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, max_dist: Tuple[int, int]):
+        # Wraps existing arrays, e.g. views of shared memory, without copying them
+        store = cls.__new__(cls)
+
+        for name in cls.FIELDS:
+            setattr(store, name, arrays[name])
+
+        store._max_dist = max_dist
+        store.__allocate_scratch()
+        return store
+
+    @classmethod
+    def random(cls, n: int, r, v, max_dist: Tuple[int, int], offset: int=0, rng: np.random.Generator=None):
+        rng = rng if rng is not None else np.random.default_rng()
+
+        x = rng.integers(offset, max_dist[0] - offset, n, endpoint=True)
+        y = rng.integers(offset, max_dist[1] - offset, n, endpoint=True)
+        return cls(x, y, r, v, max_dist, rng)
+
+    def __len__(self):
+        return len(self.x)
 
     def update(self, dt: float):
-        def bounce(pos, direction, min_val, max_val):
-            if pos < min_val:
-                return min_val, -direction
-            if pos > max_val:
-                return max_val, -direction
-            return pos, direction
-
-        self.x += self.v * self._dx * dt
-        self.y += self.v * self._dy * dt
-
-        self.x, self._dx = bounce(self.x, self._dx, self.r, self._max_dist[0] - self.r)
-        self.y, self._dy = bounce(self.y, self._dy, self.r, self._max_dist[1] - self.r)
\ No newline at end of file
+        step = self._step
+
+        np.multiply(self.v, dt, out=step)
+        self.x += np.multiply(step, self.dx, out=self._limit)
+        self.y += np.multiply(step, self.dy, out=self._limit)
+
+        self.__bounce(self.x, self.dx, self._max_dist[0])
+        self.__bounce(self.y, self.dy, self._max_dist[1])
+
+    def __allocate_scratch(self):
+        # Scratch buffers reused by every update
+        n = len(self.x)
+        self._step = np.empty(n)
+        self._limit = np.empty(n)
+        self._mask = np.empty(n, dtype=bool)
+
+    def __bounce(self, pos: np.ndarray, direction: np.ndarray, max_val: float):
+        mask, limit = self._mask, self._limit
+
+        np.less(pos, self.r, out=mask)
+        np.copyto(pos, self.r, where=mask)
+        np.negative(direction, out=direction, where=mask)
+
+        np.subtract(max_val, self.r, out=limit)
+        np.greater(pos, limit, out=mask)
+        np.copyto(pos, limit, where=mask)
+        np.negative(direction, out=direction, where=mask)
\ No newline at end of file
@@ -0,0 +1,98 @@
+import os
+import numpy as np
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+import pygame
+
+from .colors import BLACK, PALETTE
+from .particles import ParticleStore
+
+class CircleRenderer:
+    def __init__(self, screen: pygame.Surface):
+        self._screen = screen
+
+    def draw(self, particles: ParticleStore):
+        for x, y, r, c in zip(particles.x.tolist(), particles.y.tolist(), particles.r.tolist(), particles.color.tolist()):
+            pygame.draw.circle(self._screen, PALETTE[c], (x, y), r)
+
+
+class SpriteRenderer:
+    def __init__(self, screen: pygame.Surface):
+        self._screen = screen
+
+        # Indexed by radius * len(PALETTE) + color, filled on demand
+        self._sprites = []
+
+    def draw(self, particles: ParticleStore):
+        radius = np.rint(particles.r).astype(np.int64)
+        keys = radius * len(PALETTE) + particles.color
+
+        self.__ensure(int(keys.max()) if len(keys) else 0)
+
+        sprites = self._sprites
+        corners = np.stack((particles.x - radius, particles.y - radius), axis=1).tolist()
+
+        self._screen.blits([(sprites[k], corner) for k, corner in zip(keys.tolist(), corners)], doreturn=False)
+
+    def __ensure(self, key: int):
+        while len(self._sprites) <= key:
+            r, c = divmod(len(self._sprites), len(PALETTE))
+
+            sprite = pygame.Surface((2 * r + 1, 2 * r + 1)).convert()
+            sprite.fill(BLACK)
+            pygame.draw.circle(sprite, PALETTE[c], (r, r), r)
+            sprite.set_colorkey(BLACK, pygame.RLEACCEL)
+
+            self._sprites.append(sprite)
+
+
+class PixelRenderer:
+    def __init__(self, screen: pygame.Surface):
+        self._screen = screen
+        self._mapped = np.array([screen.map_rgb(color) for color in PALETTE])
+
+        # Pixel offsets covered by a disc, per integer radius
+        self._discs = {}
+
+    def draw(self, particles: ParticleStore):
+        width, height = self._screen.get_size()
+
+        radius = np.rint(particles.r).astype(np.int64)
+        px = particles.x.astype(np.int64)
+        py = particles.y.astype(np.int64)
+        colors = self._mapped[particles.color]
+
+        pixels = pygame.surfarray.pixels2d(self._screen)
+
+        # Stamp every particle of the same radius at once
+        for r in np.unique(radius).tolist():
+            members = np.flatnonzero(radius == r)
+            ox, oy = self.__disc(r)
+
+            xs = px[members, None] + ox
+            ys = py[members, None] + oy
+            inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+
+            pixels[xs[inside], ys[inside]] = np.broadcast_to(colors[members, None], xs.shape)[inside]
+
+        # Release the surface lock before the display is flipped
+        del pixels
+
+    def __disc(self, r: int):
+        if r not in self._discs:
+            oy, ox = np.mgrid[-r:r + 1, -r:r + 1]
+            inside = ox * ox + oy * oy <= r * r
+            self._discs[r] = (ox[inside], oy[inside])
+        return self._discs[r]
+
+
+def create_renderer(renderer: str, screen: pygame.Surface):
+    match(renderer):
+        case "circles":
+            return CircleRenderer(screen)
+        case "sprites":
+            return SpriteRenderer(screen)
+        case "pixels":
+            return PixelRenderer(screen)
+        case _:
+            raise ValueError(f"Invalid renderer: {renderer}")
\ No newline at end of file
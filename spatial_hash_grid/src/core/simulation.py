@@ -1,68 +1,119 @@
 import os
-import random
+import sys
+import json
+import time
+import numpy as np
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 import pygame
 
 from dataclasses import dataclass
 
-from .particles import Particle
+from .particles import ParticleStore
 from .colors import BLACK
 from .collision import create_collision_strategy
+from .contacts import resolve_elastic, kinetic_energy
+from .parallel import StripStepper
+from .rendering import create_renderer
 
 @dataclass
 class Settings:
     # Particles
     MIN_PARTICLES: int = 10
-    MAX_PARTICLES: int = 500
-    MIN_RADIUS: int = 5
-    MAX_RADIUS: int = 20
+    MAX_PARTICLES: int = 200_000
+    MIN_RADIUS: int = 1
+    MAX_RADIUS: int = 50
+    DEFAULT_RADIUS: int = 5
     MIN_VELOCITY: int = 50
     MAX_VELOCTY: int = 300
 
     # Collision
     DEFAULT_STRATEGY: str = "naive"
 
+    # Rendering
+    DEFAULT_RENDERER: str = "circles"
+
+    # Headless benchmark
+    BENCHMARK_STEPS: int = 1000
+    BENCHMARK_DT: float = 1 / 60
+
+    # Relative kinetic energy drift tolerated by the headless check of elastic response
+    ENERGY_TOLERANCE: float = 1e-9
+
     # Window
     WINDOW_WIDTH = 800
     WINDOW_HEIGHT = 600
 
 
 class Simulation:
-    def __init__(self, n: int, r: int, v: int, s: str=None):
+    def __init__(self, n: int, r: int, v: int, s: str=None, r_max: int=None, response: bool=False, headless: bool=False, steps: int=None, dt: float=None, seed: int=None, warmup: int=0, workers: int=None, world: tuple=None, renderer: str=None):
         self._settings = Settings()
 
         n = n if n is not None else self._settings.MIN_PARTICLES
-        r = r if r is not None else self._settings.MIN_RADIUS
+        r = r if r is not None else self._settings.DEFAULT_RADIUS
         v = v if v is not None else self._settings.MIN_VELOCITY
         s = s if s is not None else self._settings.DEFAULT_STRATEGY
 
         self._n = max(self._settings.MIN_PARTICLES, min(n, self._settings.MAX_PARTICLES))
         self._r = max(self._settings.MIN_RADIUS, min(r, self._settings.MAX_RADIUS))
+        self._r_max = max(self._r, min(r_max, self._settings.MAX_RADIUS)) if r_max is not None else self._r
         self._v = max(self._settings.MIN_VELOCITY, min(v, self._settings.MAX_VELOCTY))
 
-        self._collision_strategy = create_collision_strategy(s, r)
+        self._width, self._height = world if world is not None else (self._settings.WINDOW_WIDTH, self._settings.WINDOW_HEIGHT)
+
+        self._strategy_name = s
+        self._collision_strategy = create_collision_strategy(s, self._r_max, self._width, self._height)
+        self._timer = self._collision_strategy.timer
+        self._seed = seed
+        self._response = response
+        self._workers = workers if workers is not None and workers > 1 else None
+        self._renderer_name = renderer if renderer is not None else self._settings.DEFAULT_RENDERER
+
+        if headless:
+            steps = steps if steps is not None else self._settings.BENCHMARK_STEPS
+            dt = dt if dt is not None else self._settings.BENCHMARK_DT
+
+            self.__setup()
+            try:
+                self.__benchmark(steps, dt, warmup)
+            finally:
+                self.__teardown()
+            return
 
         self.__init_pygame()
         self.__setup()
-        self.__run()
+        try:
+            self.__run()
+        finally:
+            self.__teardown()
 
     def __init_pygame(self):
         pygame.init()
-        self._screen = pygame.display.set_mode((self._settings.WINDOW_WIDTH, self._settings.WINDOW_HEIGHT))
+        self._screen = pygame.display.set_mode((self._width, self._height))
+        self._renderer = create_renderer(self._renderer_name, self._screen)
         self._clock = pygame.time.Clock()
 
     def __setup(self):
-        width  = self._settings.WINDOW_WIDTH
-        height = self._settings.WINDOW_HEIGHT
+        width  = self._width
+        height = self._height
         offset = 20
 
         # Create particles
-        self._particles = []
-        for _ in range(self._n):
-            x = random.randint(offset, width - offset)
-            y = random.randint(offset, height - offset)
-            self._particles.append(Particle(x, y, self._r, self._v, (width, height)))
+        rng = np.random.default_rng(self._seed)
+        radii = rng.uniform(self._r, self._r_max, self._n) if self._r_max > self._r else self._r
+        self._particles = ParticleStore.random(self._n, radii, self._v, (width, height), offset, rng)
+
+        # Step horizontal strips in worker processes, the particles then live in shared memory
+        self._stepper = None
+        if self._workers is not None:
+            self._stepper = StripStepper(self._particles, self._strategy_name, self._r_max, (width, height), self._workers)
+            self._particles = self._stepper.particles
+
+    def __teardown(self):
+        if self._stepper is not None:
+            self._particles = None
+            self._stepper.close()
+            self._stepper = None
 
     def __run(self):
         self._running = True
@@ -73,23 +124,79 @@ class Simulation:
             self.__update(dt)
             self.__render()
 
+    def __step(self, dt: float):
+        timer = self._timer
+
+        if self._stepper is not None:
+            contacts = self._stepper.step(dt, timer)
+        else:
+            with timer.phase("integrate"):
+                self._particles.update(dt)
+
+            contacts = self._collision_strategy.execute(self._particles)
+
+        if self._response:
+            with timer.phase("response"):
+                resolve_elastic(self._particles, contacts)
+
+        return contacts
+
+    def __benchmark(self, steps: int, dt: float, warmup: int):
+        timer = self._timer
+
+        # Untimed steps, e.g. to get JIT compilation out of the way
+        for _ in range(warmup):
+            self.__step(dt)
+
+        timer.reset()
+        collisions = 0
+        energy = kinetic_energy(self._particles)
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            collisions += len(self.__step(dt))
+        total = time.perf_counter() - start
+
+        # Worker processes report their collision work as a whole
+        phases = ("integrate", "collide", "response") if self._stepper is not None else ("integrate", "grid", "broad", "narrow", "response")
+
+        report = {
+            "strategy": self._strategy_name,
+            "workers": self._workers or 1,
+            "world": [self._width, self._height],
+            "particles": self._n,
+            "radius": [self._r, self._r_max],
+            "velocity": self._v,
+            "steps": steps,
+            "dt": dt,
+            "seed": self._seed,
+            "seconds": total,
+            "steps_per_second": steps / total if total > 0 else None,
+            "phases": {name: timer.totals.get(name, 0.0) for name in phases},
+            "collisions": collisions,
+            "collisions_per_step": collisions / steps if steps else 0,
+        }
+
+        # Elastic collisions and wall bounces both keep the total kinetic energy
+        if self._response:
+            drift = kinetic_energy(self._particles) / energy - 1 if energy > 0 else 0.0
+            report["kinetic_energy_drift"] = drift
+            if abs(drift) > self._settings.ENERGY_TOLERANCE:
+                print(f"Kinetic energy drifted by {drift:.3e} over {steps} steps", file=sys.stderr)
+
+        print(json.dumps(report, indent=2))
+
     def __poll_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self._running = False
     
     def __update(self, dt: float):
-        for p in self._particles:   
-            p.update(dt)
-
-        self._collision_strategy.execute(self._particles)
+        self.__step(dt)
 
         pygame.display.set_caption(f"Spatial Hash Grid Demo - FPS: {self._clock.get_fps():.2f}")
 
     def __render(self):
         self._screen.fill(BLACK)
-
-        for p in self._particles:
-            pygame.draw.circle(self._screen, p.color, (p.x, p.y), p.r)
-
+        self._renderer.draw(self._particles)
         pygame.display.flip()
\ No newline at end of file
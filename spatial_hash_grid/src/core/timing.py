@@ -0,0 +1,19 @@
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager
+
+class PhaseTimer:
+    def __init__(self):
+        self.totals = defaultdict(float)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] += time.perf_counter() - start
+
+    def reset(self):
+        self.totals.clear()
\ No newline at end of file
@@ -13,14 +13,25 @@ class HelpOnErrorParser(argparse.ArgumentParser):
 def parse_args():    
     parser = HelpOnErrorParser(description="Spatial Hash Grid Demo Parameters")
 
-    parser.add_argument("-n", type=int, required=False, help="Number of particles (min: 10, max: 500)")
-    parser.add_argument("-r", type=int, required=False, help="The particles' radius (min: 5, max: 20)")
+    parser.add_argument("-n", type=int, required=False, help="Number of particles (min: 10, max: 200000)")
+    parser.add_argument("-r", type=int, required=False, help="The particles' radius (min: 1, max: 50)")
+    parser.add_argument("--r-max", type=int, required=False, help="Largest radius, particles get random radii in [r, r-max] (max: 50)")
     parser.add_argument("-v", type=int, required=False, help="The particles' velocity (min: 50, max: 300)")
-    parser.add_argument("-s", choices=["naive", "shg"], required=False, help="Collision strategy: naive or using spatial hash grid")
+    parser.add_argument("-s", choices=["naive", "shg", "shg-sort", "shg-adaptive", "shg-multi", "shg-jit", "shg-jit-parallel", "sap"], required=False, help="Collision strategy: naive, spatial hash grid, counting-sort spatial hash grid (fixed, adaptive or multi-level cells), its numba kernels or sweep and prune")
+    parser.add_argument("--workers", type=int, required=False, help="Step the world in this many horizontal strips, each in its own process")
+    parser.add_argument("--world", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"), required=False, help="World size (default: 800 600)")
+    parser.add_argument("--render", choices=["circles", "sprites", "pixels"], required=False, help="Renderer: one draw call per particle, cached sprites in a single blits call, or discs written into the pixel array")
+    parser.add_argument("--response", action="store_true", help="Resolve contacts with elastic collisions instead of only flagging them")
+
+    parser.add_argument("--headless", action="store_true", help="Run a fixed number of steps without a window and print timings as JSON")
+    parser.add_argument("--steps", type=int, required=False, help="Headless: number of simulated steps (default: 1000)")
+    parser.add_argument("--dt", type=float, required=False, help="Headless: fixed time step in seconds (default: 1/60)")
+    parser.add_argument("--seed", type=int, required=False, help="Seed for the particles' initial state")
+    parser.add_argument("--warmup", type=int, default=0, help="Headless: untimed steps run before measuring (default: 0)")
 
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
-    simulation = Simulation(args.n, args.r, args.v, args.s)
\ No newline at end of file
+    simulation = Simulation(args.n, args.r, args.v, args.s, args.r_max, args.response, args.headless, args.steps, args.dt, args.seed, args.warmup, args.workers, args.world, args.render)
\ No newline at end of file